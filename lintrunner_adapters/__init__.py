@@ -4,12 +4,22 @@ from __future__ import annotations
 
 __all__ = [
     "add_default_options",
+    "apply_unified_diff",
+    "as_completed_bounded",
     "as_posix",
     "available_adapters",
+    "available_cpu_count",
+    "compile_regex",
+    "display_lint_messages",
     "IS_WINDOWS",
+    "json_dumps",
+    "json_loads",
     "LintMessage",
     "LintSeverity",
+    "parse_unified_diff",
+    "ruff_command",
     "run_command",
+    "to_int",
 ]
 
 import pathlib
@@ -19,8 +29,18 @@ from ._common.lintrunner_common import (
     LintMessage,
     LintSeverity,
     add_default_options,
+    apply_unified_diff,
+    as_completed_bounded,
     as_posix,
+    available_cpu_count,
+    compile_regex,
+    display_lint_messages,
+    json_dumps,
+    json_loads,
+    parse_unified_diff,
+    ruff_command,
     run_command,
+    to_int,
 )
 
 
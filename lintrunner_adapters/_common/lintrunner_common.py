@@ -1,18 +1,57 @@
 from __future__ import annotations
 
 import argparse
+import collections
+import concurrent.futures
 import dataclasses
 import enum
+import functools
+import io
 import json
 import logging
 import os
+import re
 import subprocess
 import sys
 import time
-from typing import Any, BinaryIO
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Pattern,
+    Tuple,
+    TypeVar,
+)
 
 IS_WINDOWS: bool = os.name == "nt"
 
+json_loads: Callable[[bytes], Any]
+json_dumps: Callable[[Any], bytes]
+try:
+    # orjson is optional (`pip install lintrunner-adapters[orjson]`) but much
+    # faster on the large JSON outputs of linters and lintrunner
+    import orjson
+
+    json_loads = orjson.loads
+    json_dumps = orjson.dumps
+except ImportError:
+    json_loads = json.loads
+
+    def json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+
+_T = TypeVar("_T")
+_R = TypeVar("_R")
+
+# The 1-based start line in the original file and the (tag, line) pairs of a hunk
+DiffHunk = Tuple[int, List[Tuple[bytes, bytes]]]
+
+_HUNK_HEADER_RE = re.compile(rb"@@ -(\d+)(?:,(\d+))? \+\d+(?:,(\d+))? @@")
+
 
 def eprint(*args: Any, **kwargs: Any) -> None:
     """Print to stderr."""
@@ -38,22 +77,181 @@ class LintMessage:
     code: str
     severity: LintSeverity
     name: str
-    original: str | None
-    replacement: str | None
+    # Either may be given as UTF-8 bytes, which are decoded only when serialized
+    original: str | bytes | None
+    replacement: str | bytes | None
     description: str | None
 
     def asdict(self) -> dict[str, Any]:
-        return dataclasses.asdict(self)
+        result = dataclasses.asdict(self)
+        for key in ("original", "replacement"):
+            if isinstance(result[key], bytes):
+                result[key] = result[key].decode("utf-8")
+        return result
+
+    def dumps(self) -> str:
+        """Serialize to the JSON line lintrunner consumes."""
+        return json.dumps(self.asdict())
 
     def display(self) -> None:
         """Print to stdout for lintrunner to consume."""
-        print(json.dumps(self.asdict()), flush=True)
+        print(self.dumps(), flush=True)
+
+
+def display_lint_messages(lint_messages: Iterable[LintMessage]) -> None:
+    """Print lint messages to stdout with a single write for lintrunner to consume."""
+    sys.stdout.write("".join(f"{message.dumps()}\n" for message in lint_messages))
+    sys.stdout.flush()
+
+
+def available_cpu_count() -> int:
+    """Return the number of CPUs this process is allowed to run on.
+
+    Unlike os.cpu_count(), this respects CPU affinity (e.g. in containers on CI),
+    which avoids oversubscribing worker pools.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def as_completed_bounded(
+    executor: concurrent.futures.Executor,
+    fn: Callable[[_T], _R],
+    items: Iterable[_T],
+    *,
+    max_in_flight: int,
+) -> Iterator[tuple[_T, concurrent.futures.Future[_R]]]:
+    """Submit `fn(item)` for each item and yield `(item, future)` as they complete.
+
+    At most `max_in_flight` futures are pending at any time, so large numbers of
+    files are not all queued up front.
+    """
+    pending = collections.deque(items)
+    in_flight: dict[concurrent.futures.Future[_R], _T] = {}
+    while pending or in_flight:
+        while pending and len(in_flight) < max_in_flight:
+            item = pending.popleft()
+            in_flight[executor.submit(fn, item)] = item
+        done, _ = concurrent.futures.wait(
+            in_flight, return_when=concurrent.futures.FIRST_COMPLETED
+        )
+        for future in done:
+            yield in_flight.pop(future), future
+
+
+def parse_unified_diff(diff: bytes) -> dict[str, list[DiffHunk]]:
+    """Parse a unified diff of one or more files into hunks by file path.
+
+    Hunks are read using the line counts in their headers, so removed lines that
+    look like file headers are not mistaken for them. Lines keep their endings.
+    """
+    lines = io.BytesIO(diff).readlines()
+    hunks_by_path: dict[str, list[DiffHunk]] = {}
+    i = 0
+    while i < len(lines) - 1:
+        if not (lines[i].startswith(b"--- ") and lines[i + 1].startswith(b"+++ ")):
+            i += 1
+            continue
+        hunks = hunks_by_path.setdefault(os.fsdecode(lines[i][4:].rstrip(b"\r\n")), [])
+        i += 2
+        while i < len(lines):
+            match = _HUNK_HEADER_RE.match(lines[i])
+            if match is None:
+                break
+            i += 1
+            old_start = int(match.group(1))
+            old_count = int(match.group(2) or 1)
+            new_count = int(match.group(3) or 1)
+            body: list[tuple[bytes, bytes]] = []
+            while (old_count > 0 or new_count > 0) and i < len(lines):
+                tag, line = lines[i][:1], lines[i][1:]
+                if tag == b" ":
+                    old_count -= 1
+                    new_count -= 1
+                elif tag == b"-":
+                    old_count -= 1
+                elif tag == b"+":
+                    new_count -= 1
+                else:
+                    break
+                i += 1
+                if i < len(lines) and lines[i].startswith(b"\\"):
+                    # \ No newline at end of file
+                    line = line[:-1]
+                    i += 1
+                body.append((tag, line))
+            hunks.append((old_start, body))
+    return hunks_by_path
+
+
+def apply_unified_diff(original: bytes, hunks: list[DiffHunk]) -> bytes | None:
+    r"""Apply the hunks of a file's unified diff to its original contents.
+
+    Returns None if the diff does not match `original`.
+
+    >>> hunks = parse_unified_diff(b"--- a.py\n+++ a.py\n@@ -1,2 +1 @@\n-import os\n import sys\n")
+    >>> apply_unified_diff(b"import os\nimport sys\n", hunks["a.py"])
+    b'import sys\n'
+    >>> apply_unified_diff(b"import re\nimport sys\n", hunks["a.py"]) is None
+    True
+    """
+    original_lines = io.BytesIO(original).readlines()
+    result: list[bytes] = []
+    position = 0
+    for old_start, body in hunks:
+        # A hunk that removes nothing starts after its start line instead of at it
+        start = old_start - 1 if any(tag != b"+" for tag, _ in body) else old_start
+        if start < position:
+            return None
+        result.extend(original_lines[position:start])
+        position = start
+        for tag, line in body:
+            if tag != b"+":
+                if original_lines[position : position + 1] != [line]:
+                    return None
+                position += 1
+            if tag != b"-":
+                result.append(line)
+    result.extend(original_lines[position:])
+    return b"".join(result)
+
+
+@functools.lru_cache(maxsize=None)
+def ruff_command() -> tuple[str, ...]:
+    """Return the command that runs ruff.
+
+    The binary installed by the ruff package is run directly when it can be
+    found, instead of through `python -m ruff`, which starts an interpreter
+    only to exec the same binary.
+    """
+    try:
+        from ruff.__main__ import find_ruff_bin
+
+        return (os.fsdecode(find_ruff_bin()),)
+    except (ImportError, FileNotFoundError):
+        return (sys.executable, "-m", "ruff")
 
 
 def as_posix(name: str) -> str:
     return name.replace("\\", "/") if IS_WINDOWS else name
 
 
+@functools.lru_cache(maxsize=4096)
+def to_int(value: str | bytes) -> int:
+    """Convert a decimal string to int, memoizing repeated values.
+
+    Line and column numbers repeat a lot across diagnostics of a single run.
+    """
+    return int(value)
+
+
+@functools.lru_cache(maxsize=256)
+def compile_regex(pattern: str, flags: int = 0) -> Pattern[str]:
+    """Compile a regular expression, reusing the result for repeated patterns."""
+    return re.compile(pattern, flags)
+
+
 def _run_command(
     args: list[str],
     *,
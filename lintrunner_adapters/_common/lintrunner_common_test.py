@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import concurrent.futures
+import unittest
+from typing import Any, Callable, TypeVar
+
+from lintrunner_adapters import (
+    apply_unified_diff,
+    as_completed_bounded,
+    parse_unified_diff,
+    to_int,
+)
+
+_T = TypeVar("_T")
+
+
+def fix(original: bytes, diff: bytes, path: str = "a.py") -> bytes | None:
+    return apply_unified_diff(original, parse_unified_diff(diff)[path])
+
+
+class TestParseUnifiedDiff(unittest.TestCase):
+    def test_it_splits_hunks_by_file(self) -> None:
+        diff = (
+            b"--- a.py\n"
+            b"+++ a.py\n"
+            b"@@ -1,2 +1 @@\n"
+            b"-import os\n"
+            b" import sys\n"
+            b"--- b/c.py\n"
+            b"+++ b/c.py\n"
+            b"@@ -1 +1 @@\n"
+            b"-import re\n"
+            b"+import sys\n"
+            b"@@ -5 +5,2 @@\n"
+            b" x = 1\n"
+            b"+y = 2\n"
+            b"\n"
+            b"Would fix 2 errors.\n"
+        )
+        self.assertEqual(
+            parse_unified_diff(diff),
+            {
+                "a.py": [(1, [(b"-", b"import os\n"), (b" ", b"import sys\n")])],
+                "b/c.py": [
+                    (1, [(b"-", b"import re\n"), (b"+", b"import sys\n")]),
+                    (5, [(b" ", b"x = 1\n"), (b"+", b"y = 2\n")]),
+                ],
+            },
+        )
+
+    def test_it_does_not_mistake_removed_lines_for_file_headers(self) -> None:
+        # Replacing "-- x" with "+++ y" looks like the headers of a diff of x
+        diff = b"--- a.py\n+++ a.py\n@@ -1 +1 @@\n--- x\n++++ y\n"
+        self.assertEqual(
+            parse_unified_diff(diff),
+            {"a.py": [(1, [(b"-", b"-- x\n"), (b"+", b"+++ y\n")])]},
+        )
+        self.assertEqual(fix(b"-- x\n", diff), b"+++ y\n")
+
+    def test_it_returns_nothing_for_an_empty_diff(self) -> None:
+        self.assertEqual(parse_unified_diff(b""), {})
+        self.assertEqual(parse_unified_diff(b"Would fix 0 errors.\n"), {})
+
+
+class TestApplyUnifiedDiff(unittest.TestCase):
+    def test_it_applies_multiple_hunks(self) -> None:
+        original = b"import re\nimport sys\n\n\ndef f():\n    x = 1\n"
+        diff = (
+            b"--- a.py\n"
+            b"+++ a.py\n"
+            b"@@ -1,2 +1 @@\n"
+            b"-import re\n"
+            b" import sys\n"
+            b"@@ -5,2 +4,3 @@\n"
+            b" def f():\n"
+            b"     x = 1\n"
+            b"+    return x\n"
+        )
+        self.assertEqual(
+            fix(original, diff),
+            b"import sys\n\n\ndef f():\n    x = 1\n    return x\n",
+        )
+
+    def test_it_applies_each_file_of_a_multi_file_diff(self) -> None:
+        diff = (
+            b"--- a.py\n"
+            b"+++ a.py\n"
+            b"@@ -1 +1 @@\n"
+            b"-a = 1\n"
+            b"+a = 2\n"
+            b"--- b.py\n"
+            b"+++ b.py\n"
+            b"@@ -1 +1 @@\n"
+            b"-b = 1\n"
+            b"+b = 2\n"
+        )
+        self.assertEqual(fix(b"a = 1\n", diff, "a.py"), b"a = 2\n")
+        self.assertEqual(fix(b"b = 1\n", diff, "b.py"), b"b = 2\n")
+
+    def test_it_keeps_a_missing_newline_at_end_of_file(self) -> None:
+        diff = (
+            b"--- a.py\n"
+            b"+++ a.py\n"
+            b"@@ -1,2 +1 @@\n"
+            b"-import os\n"
+            b" x = 1\n"
+            b"\\ No newline at end of file\n"
+        )
+        self.assertEqual(fix(b"import os\nx = 1", diff), b"x = 1")
+
+    def test_it_adds_a_missing_newline_at_end_of_file(self) -> None:
+        diff = (
+            b"--- a.py\n"
+            b"+++ a.py\n"
+            b"@@ -1 +1 @@\n"
+            b"-x = 1\n"
+            b"\\ No newline at end of file\n"
+            b"+x = 1\n"
+        )
+        self.assertEqual(fix(b"x = 1", diff), b"x = 1\n")
+
+    def test_it_applies_pure_insertions(self) -> None:
+        diff = b"--- a.py\n+++ a.py\n@@ -1,0 +2 @@\n+import sys\n"
+        self.assertEqual(fix(b"import os\nx\n", diff), b"import os\nimport sys\nx\n")
+
+    def test_it_applies_insertions_into_an_empty_file(self) -> None:
+        diff = b"--- a.py\n+++ a.py\n@@ -0,0 +1 @@\n+x = 1\n"
+        self.assertEqual(fix(b"", diff), b"x = 1\n")
+
+    def test_it_applies_pure_deletions(self) -> None:
+        diff = b"--- a.py\n+++ a.py\n@@ -2,2 +1,0 @@\n-import os\n-import re\n"
+        self.assertEqual(fix(b"x\nimport os\nimport re\ny\n", diff), b"x\ny\n")
+
+    def test_it_applies_deletions_of_the_whole_file(self) -> None:
+        diff = b"--- a.py\n+++ a.py\n@@ -1,2 +0,0 @@\n-import os\n-import re\n"
+        self.assertEqual(fix(b"import os\nimport re\n", diff), b"")
+
+    def test_it_keeps_crlf_line_endings(self) -> None:
+        diff = (
+            b"--- a.py\r\n"
+            b"+++ a.py\r\n"
+            b"@@ -1,2 +1,2 @@\r\n"
+            b"-import os\r\n"
+            b"+import sys\r\n"
+            b" x = 1\r\n"
+        )
+        self.assertEqual(
+            fix(b"import os\r\nx = 1\r\n", diff), b"import sys\r\nx = 1\r\n"
+        )
+
+    def test_it_does_not_apply_when_line_endings_differ(self) -> None:
+        diff = b"--- a.py\n+++ a.py\n@@ -1,2 +1 @@\n-import os\n x = 1\n"
+        self.assertIsNone(fix(b"import os\r\nx = 1\r\n", diff))
+
+    def test_it_does_not_apply_when_context_does_not_match(self) -> None:
+        diff = b"--- a.py\n+++ a.py\n@@ -1,2 +1 @@\n-import os\n import sys\n"
+        self.assertIsNone(fix(b"import os\nimport re\n", diff))
+
+    def test_it_does_not_apply_when_removed_lines_do_not_match(self) -> None:
+        diff = b"--- a.py\n+++ a.py\n@@ -1,2 +1 @@\n-import os\n import sys\n"
+        self.assertIsNone(fix(b"import re\nimport sys\n", diff))
+
+    def test_it_does_not_apply_past_the_end_of_the_file(self) -> None:
+        diff = b"--- a.py\n+++ a.py\n@@ -3 +3 @@\n-x = 1\n+x = 2\n"
+        self.assertIsNone(fix(b"x = 1\n", diff))
+
+    def test_it_does_not_apply_overlapping_hunks(self) -> None:
+        diff = (
+            b"--- a.py\n"
+            b"+++ a.py\n"
+            b"@@ -1,2 +1,2 @@\n"
+            b"-a\n"
+            b"+b\n"
+            b" c\n"
+            b"@@ -2 +2 @@\n"
+            b"-c\n"
+            b"+d\n"
+        )
+        self.assertIsNone(fix(b"a\nc\n", diff))
+
+
+class _CountingExecutor(concurrent.futures.ThreadPoolExecutor):
+    def __init__(self) -> None:
+        super().__init__(max_workers=4)
+        self.submitted = 0
+
+    def submit(  # type: ignore[override]
+        self, fn: Callable[..., _T], *args: Any, **kwargs: Any
+    ) -> concurrent.futures.Future[_T]:
+        self.submitted += 1
+        return super().submit(fn, *args, **kwargs)
+
+
+class TestAsCompletedBounded(unittest.TestCase):
+    def test_it_yields_every_item_with_its_future(self) -> None:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+            results = {
+                item: future.result()
+                for item, future in as_completed_bounded(
+                    executor, lambda x: x * x, range(20), max_in_flight=3
+                )
+            }
+        self.assertEqual(results, {x: x * x for x in range(20)})
+
+    def test_it_limits_the_futures_in_flight(self) -> None:
+        yielded = 0
+        with _CountingExecutor() as executor:
+            for _ in as_completed_bounded(executor, str, range(10), max_in_flight=2):
+                yielded += 1
+                self.assertLessEqual(executor.submitted - yielded, 2)
+        self.assertEqual(executor.submitted, 10)
+        self.assertEqual(yielded, 10)
+
+    def test_it_raises_errors_from_result(self) -> None:
+        def fail(x: int) -> int:
+            raise ValueError(x)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            (item, future), *_ = as_completed_bounded(
+                executor, fail, [1], max_in_flight=1
+            )
+        self.assertEqual(item, 1)
+        with self.assertRaises(ValueError):
+            future.result()
+
+    def test_it_handles_no_items(self) -> None:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            self.assertEqual(
+                list(as_completed_bounded(executor, str, [], max_in_flight=1)), []
+            )
+
+
+class TestToInt(unittest.TestCase):
+    def test_it_converts_str_and_bytes(self) -> None:
+        self.assertEqual(to_int("12"), 12)
+        self.assertEqual(to_int(b"12"), 12)
+        self.assertEqual(to_int("-3"), -3)
+
+    def test_it_returns_the_same_value_when_called_again(self) -> None:
+        self.assertEqual(to_int("42"), 42)
+        self.assertEqual(to_int("42"), 42)
+
+    def test_it_rejects_non_numbers(self) -> None:
+        with self.assertRaises(ValueError):
+            to_int("x")
+
+
+if __name__ == "__main__":
+    unittest.main()
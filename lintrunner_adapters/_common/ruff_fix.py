@@ -0,0 +1,247 @@
+"""Fix computation shared by the ruff and ruff-fix adapters."""
+
+from __future__ import annotations
+
+import argparse
+import concurrent.futures
+import functools
+import logging
+import os
+import subprocess
+
+from lintrunner_adapters._common.lintrunner_common import (
+    IS_WINDOWS,
+    LintMessage,
+    LintSeverity,
+    apply_unified_diff,
+    as_completed_bounded,
+    as_posix,
+    available_cpu_count,
+    display_lint_messages,
+    parse_unified_diff,
+    ruff_command,
+    run_command,
+)
+
+
+@functools.lru_cache(maxsize=None)
+def fix_command(config: str | None) -> tuple[str, ...]:
+    """Return the ruff command line shared by every fix invocation."""
+    return (
+        *ruff_command(),
+        "check",
+        "--fix-only",
+        "--exit-zero",
+        *((f"--config={config}",) if config else ()),
+    )
+
+
+def check_files(
+    filenames: list[str],
+    *,
+    linter_code: str,
+    config: str | None,
+    retries: int,
+    timeout: int,
+) -> list[LintMessage]:
+    """Compute the fixes for `filenames` from a single `ruff --diff` run.
+
+    Notebooks, whose diffs are split by cell, files whose diff does not apply,
+    and all files if ruff fails are fixed one by one with check_file instead.
+    """
+    fix_one_by_one = functools.partial(
+        check_file,
+        linter_code=linter_code,
+        config=config,
+        retries=retries,
+        timeout=timeout,
+    )
+    notebooks = [filename for filename in filenames if filename.endswith(".ipynb")]
+    filenames = [filename for filename in filenames if not filename.endswith(".ipynb")]
+    lint_messages = [
+        lint_message
+        for notebook in notebooks
+        for lint_message in fix_one_by_one(notebook)
+    ]
+    if not filenames:
+        return lint_messages
+
+    try:
+        proc = run_command(
+            [*fix_command(config), "--diff", *filenames],
+            retries=retries,
+            timeout=timeout,
+        )
+    except (OSError, subprocess.SubprocessError):
+        proc = None
+    if proc is None or proc.returncode != 0:
+        lint_messages.extend(
+            lint_message
+            for filename in filenames
+            for lint_message in fix_one_by_one(filename)
+        )
+        return lint_messages
+
+    # ruff prints paths relative to the working directory
+    normalized_filenames = {
+        os.path.normcase(os.path.abspath(filename)): filename for filename in filenames
+    }
+    for path, hunks in parse_unified_diff(proc.stdout).items():
+        filename = normalized_filenames.get(os.path.normcase(os.path.abspath(path)))
+        if filename is None:
+            continue
+        try:
+            with open(filename, "rb") as f:
+                original = f.read()
+        except OSError:
+            lint_messages.extend(fix_one_by_one(filename))
+            continue
+        replacement = apply_unified_diff(original, hunks)
+        if replacement is None:
+            lint_messages.extend(fix_one_by_one(filename))
+        else:
+            lint_messages.extend(
+                format_fix(filename, original, replacement, linter_code=linter_code)
+            )
+    return lint_messages
+
+
+def format_fix(
+    filename: str, original: bytes, replacement: bytes, *, linter_code: str
+) -> list[LintMessage]:
+    if original == replacement:
+        return []
+
+    return [
+        LintMessage(
+            path=filename,
+            name="format",
+            description="Run `lintrunner -a` to apply this patch.",
+            line=None,
+            char=None,
+            code=linter_code,
+            severity=LintSeverity.WARNING,
+            original=original,
+            replacement=replacement,
+        )
+    ]
+
+
+def check_file(
+    filename: str,
+    *,
+    linter_code: str,
+    config: str | None,
+    retries: int,
+    timeout: int,
+) -> list[LintMessage]:
+    try:
+        with open(filename, "rb") as f:
+            original = f.read()
+        proc_fix = run_command(
+            [*fix_command(config), "--stdin-filename", filename, "-"],
+            input=original,
+            retries=retries,
+            timeout=timeout,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError) as err:
+        return [
+            LintMessage(
+                path=None,
+                line=None,
+                char=None,
+                code=linter_code,
+                severity=LintSeverity.ERROR,
+                name="command-failed",
+                original=None,
+                replacement=None,
+                description=(
+                    f"Failed due to {err.__class__.__name__}:\n{err}"
+                    if not isinstance(err, subprocess.CalledProcessError)
+                    else (
+                        f"COMMAND (exit code {err.returncode})\n"
+                        f"{' '.join(map(as_posix, err.cmd))}\n\n"
+                        f"STDERR\n{err.stderr.decode('utf-8').strip() or '(empty)'}\n\n"
+                        f"STDOUT\n{err.stdout.decode('utf-8').strip() or '(empty)'}"
+                    )
+                ),
+            )
+        ]
+
+    return format_fix(filename, original, proc_fix.stdout, linter_code=linter_code)
+
+
+def add_fix_options(parser: argparse.ArgumentParser) -> None:
+    """Add the options that control how fixes are computed to a parser."""
+    parser.add_argument(
+        "--pool",
+        choices=["threads", "processes"],
+        default="threads" if IS_WINDOWS else "processes",
+        help="Run ruff on batches of files in a pool of threads or of processes",
+    )
+    parser.add_argument(
+        "--batch-size",
+        default=256,
+        type=int,
+        help="Number of files to fix with each ruff invocation",
+    )
+    parser.add_argument(
+        "--jobs",
+        default=2,
+        type=int,
+        help="Number of batches to fix at once. ruff already processes the files "
+        "of a batch in parallel, so more jobs than this mostly compete for the "
+        "same CPUs.",
+    )
+
+
+def display_fixes(
+    filenames: list[str],
+    *,
+    linter_code: str,
+    config: str | None,
+    retries: int,
+    timeout: int,
+    pool: str,
+    batch_size: int,
+    jobs: int,
+) -> None:
+    """Compute and display the fixes for `filenames`, in batches of files.
+
+    `pool`, `batch_size` and `jobs` are the options added by add_fix_options.
+    """
+    batches = [
+        filenames[i : i + batch_size] for i in range(0, len(filenames), batch_size)
+    ]
+
+    # A couple of batches overlap the Python side of one batch with ruff
+    # running the next without oversubscribing the CPUs ruff already uses
+    max_workers = max(1, min(jobs, available_cpu_count()))
+    executor: concurrent.futures.Executor
+    if pool == "processes":
+        # Keeps the Python-side work of each file off the GIL
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=max_workers)
+    else:
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="Thread",
+        )
+    with executor:
+        for batch, future in as_completed_bounded(
+            executor,
+            functools.partial(
+                check_files,
+                linter_code=linter_code,
+                config=config,
+                retries=retries,
+                timeout=timeout,
+            ),
+            batches,
+            max_in_flight=2 * max_workers,
+        ):
+            try:
+                display_lint_messages(future.result())
+            except Exception:
+                logging.critical('Failed at "%s".', " ".join(batch))
+                raise
@@ -5,7 +5,6 @@ from __future__ import annotations
 import argparse
 import concurrent.futures
 import logging
-import os
 import subprocess
 import sys
 
@@ -14,6 +13,8 @@ from lintrunner_adapters import (
     LintSeverity,
     add_default_options,
     as_posix,
+    available_cpu_count,
+    display_lint_messages,
     run_command,
 )
 
@@ -28,19 +29,18 @@ def check_file(
     try:
         with open(filename, "rb") as f:
             original = f.read()
-        with open(filename, "rb") as f:
-            proc = run_command(
-                [
-                    sys.executable,
-                    "-madd_trailing_comma",
-                    "--exit-zero-even-if-changed",
-                    "-",
-                ],
-                stdin=f,
-                retries=retries,
-                timeout=timeout,
-                check=True,
-            )
+        proc = run_command(
+            [
+                sys.executable,
+                "-madd_trailing_comma",
+                "--exit-zero-even-if-changed",
+                "-",
+            ],
+            input=original,
+            retries=retries,
+            timeout=timeout,
+            check=True,
+        )
     except subprocess.TimeoutExpired:
         return [
             LintMessage(
@@ -91,8 +91,8 @@ def check_file(
             code=LINTER_CODE,
             severity=LintSeverity.WARNING,
             name="format",
-            original=original.decode("utf-8"),
-            replacement=replacement.decode("utf-8"),
+            original=original,
+            replacement=replacement,
             description="Run `lintrunner -a` to apply this patch.",
         )
     ]
@@ -125,7 +125,7 @@ def main() -> None:
     )
 
     with concurrent.futures.ThreadPoolExecutor(
-        max_workers=os.cpu_count(),
+        max_workers=available_cpu_count(),
         thread_name_prefix="Thread",
     ) as executor:
         futures = {
@@ -134,8 +134,7 @@ def main() -> None:
         }
         for future in concurrent.futures.as_completed(futures):
             try:
-                for lint_message in future.result():
-                    lint_message.display()
+                display_lint_messages(future.result())
             except Exception:
                 logging.critical('Failed at "%s".', futures[future])
                 raise
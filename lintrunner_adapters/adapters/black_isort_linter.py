@@ -7,7 +7,6 @@ from __future__ import annotations
 import argparse
 import concurrent.futures
 import logging
-import os
 import pathlib
 import subprocess
 import sys
@@ -28,39 +27,38 @@ def check_file(
     try:
         with open(filename, "rb") as f:
             original = f.read()
-        with open(filename, "rb") as f:
-            # Run isort first then black so we get consistent result
-            # even if isort is not using the black profile
-            proc = run_command(
-                [sys.executable, "-misort", "-"],
-                stdin=f,
-                retries=retries,
-                timeout=timeout,
-                check=True,
-            )
-            import_sorted = proc.stdout
-            # Pipe isort's result to black
-
-            # Resolve the file path to get around errors with Python 3.8/3.9 on Windows
-            # https://github.com/psf/black/issues/4209
-            resolved_filename = str(pathlib.Path(filename).resolve())
-            proc = run_command(
-                [
-                    sys.executable,
-                    "-mblack",
-                    *(("--pyi",) if filename.endswith(".pyi") else ()),
-                    *(("--ipynb",) if filename.endswith(".ipynb") else ()),
-                    *(("--fast",) if fast else ()),
-                    "--stdin-filename",
-                    resolved_filename,
-                    "-",
-                ],
-                stdin=None,
-                input=import_sorted,
-                retries=retries,
-                timeout=timeout,
-                check=True,
-            )
+        # Run isort first then black so we get consistent result
+        # even if isort is not using the black profile
+        proc = run_command(
+            [sys.executable, "-misort", "-"],
+            input=original,
+            retries=retries,
+            timeout=timeout,
+            check=True,
+        )
+        import_sorted = proc.stdout
+        # Pipe isort's result to black
+
+        # Resolve the file path to get around errors with Python 3.8/3.9 on Windows
+        # https://github.com/psf/black/issues/4209
+        resolved_filename = str(pathlib.Path(filename).resolve())
+        proc = run_command(
+            [
+                sys.executable,
+                "-mblack",
+                *(("--pyi",) if filename.endswith(".pyi") else ()),
+                *(("--ipynb",) if filename.endswith(".ipynb") else ()),
+                *(("--fast",) if fast else ()),
+                "--stdin-filename",
+                resolved_filename,
+                "-",
+            ],
+            stdin=None,
+            input=import_sorted,
+            retries=retries,
+            timeout=timeout,
+            check=True,
+        )
     except subprocess.TimeoutExpired:
         return [
             LintMessage(
@@ -120,8 +118,8 @@ def check_file(
             code=LINTER_CODE,
             severity=LintSeverity.WARNING,
             name="format",
-            original=original.decode("utf-8"),
-            replacement=replacement.decode("utf-8"),
+            original=original,
+            replacement=replacement,
             description="Run `lintrunner -a` to apply this patch.",
         )
     ]
@@ -159,7 +157,7 @@ def main() -> None:
     )
 
     with concurrent.futures.ThreadPoolExecutor(
-        max_workers=os.cpu_count(),
+        max_workers=lintrunner_adapters.available_cpu_count(),
         thread_name_prefix="Thread",
     ) as executor:
         futures = {
@@ -168,8 +166,7 @@ def main() -> None:
         }
         for future in concurrent.futures.as_completed(futures):
             try:
-                for lint_message in future.result():
-                    lint_message.display()
+                lintrunner_adapters.display_lint_messages(future.result())
             except Exception:
                 logging.critical('Failed at "%s".', futures[future])
                 raise
@@ -5,7 +5,6 @@ from __future__ import annotations
 import argparse
 import concurrent.futures
 import logging
-import os
 import pathlib
 import subprocess
 import sys
@@ -26,26 +25,25 @@ def check_file(
     try:
         with open(filename, "rb") as f:
             original = f.read()
-        with open(filename, "rb") as f:
-            # Resolve the file path to get around errors with Python 3.8/3.9 on Windows
-            # https://github.com/psf/black/issues/4209
-            resolved_filename = str(pathlib.Path(filename).resolve())
-            proc = run_command(
-                [
-                    sys.executable,
-                    "-mblack",
-                    *(("--pyi",) if filename.endswith(".pyi") else ()),
-                    *(("--ipynb",) if filename.endswith(".ipynb") else ()),
-                    *(("--fast",) if fast else ()),
-                    "--stdin-filename",
-                    resolved_filename,
-                    "-",
-                ],
-                stdin=f,
-                retries=retries,
-                timeout=timeout,
-                check=True,
-            )
+        # Resolve the file path to get around errors with Python 3.8/3.9 on Windows
+        # https://github.com/psf/black/issues/4209
+        resolved_filename = str(pathlib.Path(filename).resolve())
+        proc = run_command(
+            [
+                sys.executable,
+                "-mblack",
+                *(("--pyi",) if filename.endswith(".pyi") else ()),
+                *(("--ipynb",) if filename.endswith(".ipynb") else ()),
+                *(("--fast",) if fast else ()),
+                "--stdin-filename",
+                resolved_filename,
+                "-",
+            ],
+            input=original,
+            retries=retries,
+            timeout=timeout,
+            check=True,
+        )
     except subprocess.TimeoutExpired:
         return [
             LintMessage(
@@ -105,8 +103,8 @@ def check_file(
             code=LINTER_CODE,
             severity=LintSeverity.WARNING,
             name="format",
-            original=original.decode("utf-8"),
-            replacement=replacement.decode("utf-8"),
+            original=original,
+            replacement=replacement,
             description="Run `lintrunner -a` to apply this patch.",
         )
     ]
@@ -144,7 +142,7 @@ def main() -> None:
     )
 
     with concurrent.futures.ThreadPoolExecutor(
-        max_workers=os.cpu_count(),
+        max_workers=lintrunner_adapters.available_cpu_count(),
         thread_name_prefix="Thread",
     ) as executor:
         futures = {
@@ -153,8 +151,7 @@ def main() -> None:
         }
         for future in concurrent.futures.as_completed(futures):
             try:
-                for lint_message in future.result():
-                    lint_message.display()
+                lintrunner_adapters.display_lint_messages(future.result())
             except Exception:
                 logging.critical('Failed at "%s".', futures[future])
                 raise
@@ -98,8 +98,8 @@ def check_file(
             code=LINTER_CODE,
             severity=LintSeverity.WARNING,
             name="format",
-            original=original.decode("utf-8"),
-            replacement=replacement.decode("utf-8"),
+            original=original,
+            replacement=replacement,
             description="See https://clang.llvm.org/docs/ClangFormat.html.\nRun `lintrunner -a` to apply this patch.",
         )
     ]
@@ -189,7 +189,7 @@ def main() -> None:
             sys.exit(0)
 
     with concurrent.futures.ThreadPoolExecutor(
-        max_workers=os.cpu_count(),
+        max_workers=lintrunner_adapters.available_cpu_count(),
         thread_name_prefix="Thread",
     ) as executor:
         futures = {
@@ -200,8 +200,7 @@ def main() -> None:
         }
         for future in concurrent.futures.as_completed(futures):
             try:
-                for lint_message in future.result():
-                    lint_message.display()
+                lintrunner_adapters.display_lint_messages(future.result())
             except Exception:
                 logging.critical('Failed at "%s".', futures[future])
                 raise
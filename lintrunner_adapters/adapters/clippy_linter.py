@@ -230,8 +230,7 @@ def main() -> None:
     )
 
     lint_messages = check_files(args.filenames, retries=args.retries)
-    for lint_message in lint_messages:
-        lint_message.display()
+    lintrunner_adapters.display_lint_messages(lint_messages)
 
 
 if __name__ == "__main__":
@@ -5,18 +5,24 @@ from __future__ import annotations
 import argparse
 import concurrent.futures
 import logging
-import os
-import re
 import subprocess
 from typing import Pattern
 
-from lintrunner_adapters import LintMessage, LintSeverity, as_posix, run_command
+from lintrunner_adapters import (
+    LintMessage,
+    LintSeverity,
+    as_posix,
+    available_cpu_count,
+    compile_regex,
+    display_lint_messages,
+    run_command,
+)
 
 LINTER_CODE = "CMAKE"
 
 
 # CMakeLists.txt:901: Lines should be <= 80 characters long [linelength]
-RESULTS_RE: Pattern[str] = re.compile(
+RESULTS_RE: Pattern[str] = compile_regex(
     r"""(?mx)
     ^
     (?P<file>.*?):
@@ -100,7 +106,7 @@ def main() -> None:
     args = parser.parse_args()
 
     with concurrent.futures.ThreadPoolExecutor(
-        max_workers=os.cpu_count(),
+        max_workers=available_cpu_count(),
         thread_name_prefix="Thread",
     ) as executor:
         futures = {
@@ -113,8 +119,7 @@ def main() -> None:
         }
         for future in concurrent.futures.as_completed(futures):
             try:
-                for lint_message in future.result():
-                    lint_message.display()
+                display_lint_messages(future.result())
             except Exception:
                 logging.critical('Failed at "%s".', futures[future])
                 raise
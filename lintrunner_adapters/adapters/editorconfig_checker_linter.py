@@ -4,16 +4,15 @@ from __future__ import annotations
 
 import argparse
 import logging
-import re
 import sys
 from typing import Pattern
 
 import lintrunner_adapters
-from lintrunner_adapters import LintMessage, LintSeverity, run_command
+from lintrunner_adapters import LintMessage, LintSeverity, compile_regex, run_command
 
 LINTER_CODE = "EDITORCONFIG-CHECKER"
 
-RESULTS_RE: Pattern[str] = re.compile(
+RESULTS_RE: Pattern[str] = compile_regex(
     r"""(?mx)
     ^
     [ \t]*  # Leading whitespace.
@@ -113,8 +112,7 @@ def main() -> None:
         list(args.filenames),
         retries=args.retries,
     )
-    for lint_message in lint_messages:
-        lint_message.display()
+    lintrunner_adapters.display_lint_messages(lint_messages)
 
 
 if __name__ == "__main__":
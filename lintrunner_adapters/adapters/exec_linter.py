@@ -9,7 +9,7 @@ import logging
 import os
 import sys
 
-from lintrunner_adapters import LintMessage, LintSeverity
+from lintrunner_adapters import LintMessage, LintSeverity, display_lint_messages
 
 LINTER_CODE = "EXEC"
 
@@ -66,8 +66,7 @@ def main() -> None:
         if lint_message is not None:
             lint_messages.append(lint_message)
 
-    for lint_message in lint_messages:
-        lint_message.display()
+    display_lint_messages(lint_messages)
 
 
 if __name__ == "__main__":
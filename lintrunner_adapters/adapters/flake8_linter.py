@@ -4,13 +4,19 @@ from __future__ import annotations
 
 import argparse
 import logging
-import re
 import subprocess
 import sys
 from typing import Pattern
 
 import lintrunner_adapters
-from lintrunner_adapters import LintMessage, LintSeverity, as_posix, run_command
+from lintrunner_adapters import (
+    LintMessage,
+    LintSeverity,
+    as_posix,
+    compile_regex,
+    run_command,
+    to_int,
+)
 
 LINTER_CODE = "FLAKE8"
 
@@ -77,14 +83,14 @@ def documented_in_dlint(code: str) -> bool:
 # https://www.pydocstyle.org/en/stable/error_codes.html
 def documented_in_pydocstyle(code: str) -> bool:
     """Returns whether the given code is documented in pydocstyle."""
-    return re.match(r"D[0-9]{3}", code) is not None
+    return compile_regex(r"D[0-9]{3}").match(code) is not None
 
 
 # stdin:2: W802 undefined name 'foo'
 # stdin:3:6: T484 Name 'foo' is not defined
 # stdin:3:-100: W605 invalid escape sequence '\/'
 # stdin:3:1: E302 expected 2 blank lines, found 1
-RESULTS_RE: Pattern[str] = re.compile(
+RESULTS_RE: Pattern[str] = compile_regex(
     r"""(?mx)
     ^
     (?P<file>.*?):
@@ -251,9 +257,9 @@ def check_files(
                 match["code"],
                 show_disable,
             ),
-            line=int(match["line"]),
+            line=to_int(match["line"]),
             char=(
-                int(match["column"])
+                to_int(match["column"])
                 if match["column"] is not None and not match["column"].startswith("-")
                 else None
             ),
@@ -331,8 +337,7 @@ def main() -> None:
         docstring_convention=args.docstring_convention,
         show_disable=args.show_disable,
     )
-    for lint_message in lint_messages:
-        lint_message.display()
+    lintrunner_adapters.display_lint_messages(lint_messages)
 
 
 if __name__ == "__main__":
@@ -5,59 +5,72 @@
 from __future__ import annotations
 
 import argparse
+import concurrent.futures
+import functools
 import logging
 import subprocess
 import sys
 
-from lintrunner_adapters import LintMessage, LintSeverity, as_posix, run_command
+from lintrunner_adapters import (
+    LintMessage,
+    LintSeverity,
+    as_posix,
+    available_cpu_count,
+    display_lint_messages,
+    run_command,
+)
+
+
+def format_error_message(linter_name: str, err: Exception) -> LintMessage:
+    return LintMessage(
+        path=None,
+        line=None,
+        char=None,
+        code=linter_name,
+        severity=LintSeverity.ERROR,
+        name="command-failed",
+        original=None,
+        replacement=None,
+        description=(
+            f"Failed due to {err.__class__.__name__}:\n{err}"
+            if not isinstance(err, subprocess.CalledProcessError)
+            else (
+                "COMMAND (exit code {returncode})\n"
+                "{command}\n\n"
+                "STDERR\n{stderr}\n\n"
+                "STDOUT\n{stdout}"
+            ).format(
+                returncode=err.returncode,
+                command=" ".join(as_posix(x) for x in err.cmd),
+                stderr=err.stderr.decode("utf-8").strip() or "(empty)",
+                stdout=err.stdout.decode("utf-8").strip() or "(empty)",
+            )
+        ),
+    )
 
 
 def lint_file(
-    matching_line: str,
+    filename: str,
+    matching_lines: list[str],
     allowlist_pattern: str,
     replace_pattern: str,
     linter_name: str,
     error_name: str,
     error_description: str,
-) -> LintMessage | None:
-    # matching_line looks like:
+) -> list[LintMessage]:
+    # Each of the matching_lines looks like:
     #   tools/linter/clangtidy_linter.py:13:import foo.bar.baz
-    split = matching_line.split(":")
-    filename = split[0]
-
+    # The allowlist check and the replacement only depend on the file, so
+    # they are computed once and shared by all matches in the file.
     if allowlist_pattern:
         try:
             proc = run_command(["grep", "-nEHI", allowlist_pattern, filename])
         except Exception as err:
-            return LintMessage(
-                path=None,
-                line=None,
-                char=None,
-                code=linter_name,
-                severity=LintSeverity.ERROR,
-                name="command-failed",
-                original=None,
-                replacement=None,
-                description=(
-                    f"Failed due to {err.__class__.__name__}:\n{err}"
-                    if not isinstance(err, subprocess.CalledProcessError)
-                    else (
-                        "COMMAND (exit code {returncode})\n"
-                        "{command}\n\n"
-                        "STDERR\n{stderr}\n\n"
-                        "STDOUT\n{stdout}"
-                    ).format(
-                        returncode=err.returncode,
-                        command=" ".join(as_posix(x) for x in err.cmd),
-                        stderr=err.stderr.decode("utf-8").strip() or "(empty)",
-                        stdout=err.stdout.decode("utf-8").strip() or "(empty)",
-                    )
-                ),
-            )
+            return [format_error_message(linter_name, err)]
 
         # allowlist pattern was found, abort lint
         if proc.returncode == 0:
-            return None
+            return []
 
     original = None
     replacement = None
@@ -69,43 +82,25 @@ def lint_file(
             proc = run_command(["sed", "-r", replace_pattern, filename])
             replacement = proc.stdout.decode("utf-8")
         except Exception as err:
-            return LintMessage(
-                path=None,
-                line=None,
+            return [format_error_message(linter_name, err)]
+
+    lint_messages = []
+    for matching_line in matching_lines:
+        split = matching_line.split(":")
+        lint_messages.append(
+            LintMessage(
+                path=split[0],
+                line=int(split[1]) if len(split) > 1 else None,
                 char=None,
                 code=linter_name,
                 severity=LintSeverity.ERROR,
-                name="command-failed",
-                original=None,
-                replacement=None,
-                description=(
-                    f"Failed due to {err.__class__.__name__}:\n{err}"
-                    if not isinstance(err, subprocess.CalledProcessError)
-                    else (
-                        "COMMAND (exit code {returncode})\n"
-                        "{command}\n\n"
-                        "STDERR\n{stderr}\n\n"
-                        "STDOUT\n{stdout}"
-                    ).format(
-                        returncode=err.returncode,
-                        command=" ".join(as_posix(x) for x in err.cmd),
-                        stderr=err.stderr.decode("utf-8").strip() or "(empty)",
-                        stdout=err.stdout.decode("utf-8").strip() or "(empty)",
-                    )
-                ),
+                name=error_name,
+                original=original,
+                replacement=replacement,
+                description=error_description,
             )
-
-    return LintMessage(
-        path=split[0],
-        line=int(split[1]) if len(split) > 1 else None,
-        char=None,
-        code=linter_name,
-        severity=LintSeverity.ERROR,
-        name=error_name,
-        original=original,
-        replacement=replacement,
-        description=error_description,
-    )
+        )
+    return lint_messages
 
 
 def main() -> None:
@@ -182,46 +177,38 @@ def main() -> None:
             ["grep", "-nEHI", *files_with_matches, args.pattern, *args.filenames]
         )
     except Exception as err:
-        err_msg = LintMessage(
-            path=None,
-            line=None,
-            char=None,
-            code=args.linter_name,
-            severity=LintSeverity.ERROR,
-            name="command-failed",
-            original=None,
-            replacement=None,
-            description=(
-                f"Failed due to {err.__class__.__name__}:\n{err}"
-                if not isinstance(err, subprocess.CalledProcessError)
-                else (
-                    "COMMAND (exit code {returncode})\n"
-                    "{command}\n\n"
-                    "STDERR\n{stderr}\n\n"
-                    "STDOUT\n{stdout}"
-                ).format(
-                    returncode=err.returncode,
-                    command=" ".join(as_posix(x) for x in err.cmd),
-                    stderr=err.stderr.decode("utf-8").strip() or "(empty)",
-                    stdout=err.stdout.decode("utf-8").strip() or "(empty)",
-                )
-            ),
-        )
+        err_msg = format_error_message(args.linter_name, err)
         err_msg.display()
         sys.exit(0)
 
-    lines = proc.stdout.decode().splitlines()
-    for line in lines:
-        lint_message = lint_file(
-            line,
-            args.allowlist_pattern,
-            args.replace_pattern,
-            args.linter_name,
-            args.error_name,
-            args.error_description,
+    matching_lines_by_file: dict[str, list[str]] = {}
+    for line in proc.stdout.decode().splitlines():
+        filename = line.split(":")[0]
+        matching_lines_by_file.setdefault(filename, []).append(line)
+
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=available_cpu_count(),
+        thread_name_prefix="Thread",
+    ) as executor:
+        # map keeps grep's file order so the output does not depend on timing
+        results = executor.map(
+            functools.partial(
+                lint_file,
+                allowlist_pattern=args.allowlist_pattern,
+                replace_pattern=args.replace_pattern,
+                linter_name=args.linter_name,
+                error_name=args.error_name,
+                error_description=args.error_description,
+            ),
+            matching_lines_by_file,
+            matching_lines_by_file.values(),
         )
-        if lint_message is not None:
-            lint_message.display()
+        for filename in matching_lines_by_file:
+            try:
+                display_lint_messages(next(results))
+            except Exception:
+                logging.critical('Failed at "%s".', filename)
+                raise
 
 
 if __name__ == "__main__":
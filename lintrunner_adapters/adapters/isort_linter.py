@@ -5,7 +5,6 @@ from __future__ import annotations
 import argparse
 import concurrent.futures
 import logging
-import os
 import subprocess
 import sys
 
@@ -23,14 +22,13 @@ def check_file(
     try:
         with open(filename, "rb") as f:
             original = f.read()
-        with open(filename, "rb") as f:
-            proc = run_command(
-                [sys.executable, "-misort", "-"],
-                stdin=f,
-                retries=retries,
-                timeout=timeout,
-                check=True,
-            )
+        proc = run_command(
+            [sys.executable, "-misort", "-"],
+            input=original,
+            retries=retries,
+            timeout=timeout,
+            check=True,
+        )
     except subprocess.TimeoutExpired:
         return [
             LintMessage(
@@ -90,8 +88,8 @@ def check_file(
             code=LINTER_CODE,
             severity=LintSeverity.WARNING,
             name="format",
-            original=original.decode("utf-8"),
-            replacement=replacement.decode("utf-8"),
+            original=original,
+            replacement=replacement,
             description="Run `lintrunner -a` to apply this patch.",
         )
     ]
@@ -124,7 +122,7 @@ def main() -> None:
     )
 
     with concurrent.futures.ThreadPoolExecutor(
-        max_workers=os.cpu_count(),
+        max_workers=lintrunner_adapters.available_cpu_count(),
         thread_name_prefix="Thread",
     ) as executor:
         futures = {
@@ -133,8 +131,7 @@ def main() -> None:
         }
         for future in concurrent.futures.as_completed(futures):
             try:
-                for lint_message in future.result():
-                    lint_message.display()
+                lintrunner_adapters.display_lint_messages(future.result())
             except Exception:
                 logging.critical('Failed at "%s".', futures[future])
                 raise
@@ -3,29 +3,33 @@
 from __future__ import annotations
 
 import argparse
+import functools
 import logging
-import pathlib
-import re
+import os
 import sys
-from pathlib import Path
 from typing import Pattern
 
 import lintrunner_adapters
-from lintrunner_adapters import LintMessage, LintSeverity, run_command
+from lintrunner_adapters import (
+    LintMessage,
+    LintSeverity,
+    compile_regex,
+    run_command,
+    to_int,
+)
 
 LINTER_CODE = "MYPY"
 
 # tools/linter/flake8_linter.py:15:13: error: Incompatibl...int")  [assignment]
-RESULTS_RE: Pattern[str] = re.compile(
-    r"""(?mx)
-    ^
+# Matched against one line of output at a time with fullmatch.
+RESULTS_RE: Pattern[str] = compile_regex(
+    r"""(?x)
     (?P<file>.*?):
     (?P<line>\d+):
     (?:(?P<column>-?\d+):)?
     \s(?P<severity>\S+?):?
     \s(?P<message>.*?)
     (?:\s\[(?P<code>.*)\])?
-    $
     """
 )
 
@@ -33,7 +37,7 @@ RESULTS_RE: Pattern[str] = re.compile(
 def _test_results_re() -> None:
     """Doctests.
 
-    >>> def t(s): return RESULTS_RE.search(s).groupdict()
+    >>> def t(s): return RESULTS_RE.fullmatch(s).groupdict()
 
     >>> t(r'prog.py:1: error: "str" has no attribute "trim"  [attr-defined]')
     ... # doctest: +NORMALIZE_WHITESPACE
@@ -61,6 +65,17 @@ SEVERITIES = {
 }
 
 
+def _stub_files_in(directory: str) -> frozenset[str]:
+    """Return the names of the .pyi files directly under `directory`."""
+    try:
+        with os.scandir(directory or ".") as entries:
+            return frozenset(
+                entry.name for entry in entries if entry.name.endswith(".pyi")
+            )
+    except OSError:
+        return frozenset()
+
+
 def disable_message(code: str) -> str:
     if code is None:
         return ""
@@ -100,9 +115,9 @@ def check_files(
             name=match["code"] or "note",
             description=match["message"]
             + (disable_message(match["code"]) if show_disable else ""),
-            line=int(match["line"]),
+            line=to_int(match["line"]),
             char=(
-                int(match["column"])
+                to_int(match["column"])
                 if match["column"] is not None and not match["column"].startswith("-")
                 else None
             ),
@@ -111,7 +126,8 @@ def check_files(
             original=None,
             replacement=None,
         )
-        for match in RESULTS_RE.finditer(stdout)
+        for match in map(RESULTS_RE.fullmatch, stdout.splitlines())
+        if match is not None
     ]
 
 
@@ -156,13 +172,18 @@ def main() -> None:
 
     # If a stub file exists, have mypy check it instead of the original file, in
     # accordance with PEP-484 (see https://www.python.org/dev/peps/pep-0484/#stub-files)
+    # Directories are listed once instead of probing for a stub next to every file.
+    stubs_by_directory: dict[str, frozenset[str]] = {}
     for filename in args.filenames:
         if filename.endswith(".pyi"):
             filenames[filename] = True
             continue
 
         stub_filename = filename.replace(".py", ".pyi")
-        if Path(stub_filename).exists():
+        directory, stub_name = os.path.split(stub_filename)
+        if directory not in stubs_by_directory:
+            stubs_by_directory[directory] = _stub_files_in(directory)
+        if stub_name in stubs_by_directory[directory]:
             filenames[stub_filename] = True
         else:
             filenames[filename] = True
@@ -174,23 +195,27 @@ def main() -> None:
         show_disable=args.show_disable,
     )
 
-    all_files = {str(pathlib.Path(path).resolve()) for path in filenames}
+    realpath = functools.lru_cache(maxsize=None)(os.path.realpath)
+    all_files = {realpath(path) for path in filenames}
+    messages_to_display = []
     for lint_message in lint_messages:
         if lint_message.severity == LintSeverity.ADVICE and not args.show_notes:
             continue
 
         # Filter out messages for files not being linted because mypy sometimes
         # picks up files imported by the files being linted.
-        if lint_message.path is not None:
-            path = str(pathlib.Path(lint_message.path).resolve())
-            if path not in all_files:
-                logging.warning(
-                    "Lint message %s is for a file '%s' not being linted",
-                    lint_message,
-                    lint_message.path,
-                )
-                continue
-        lint_message.display()
+        if (
+            lint_message.path is not None
+            and realpath(lint_message.path) not in all_files
+        ):
+            logging.warning(
+                "Lint message %s is for a file '%s' not being linted",
+                lint_message,
+                lint_message.path,
+            )
+            continue
+        messages_to_display.append(lint_message)
+    lintrunner_adapters.display_lint_messages(messages_to_display)
 
 
 if __name__ == "__main__":
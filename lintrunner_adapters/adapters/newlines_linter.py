@@ -8,7 +8,12 @@ import argparse
 import logging
 import sys
 
-from lintrunner_adapters import IS_WINDOWS, LintMessage, LintSeverity
+from lintrunner_adapters import (
+    IS_WINDOWS,
+    LintMessage,
+    LintSeverity,
+    display_lint_messages,
+)
 
 NEWLINE = 10  # ASCII "\n"
 CARRIAGE_RETURN = 13  # ASCII "\r"
@@ -149,5 +154,4 @@ if __name__ == "__main__":
         if lint_message is not None:
             lint_messages.append(lint_message)
 
-    for lint_message in lint_messages:
-        lint_message.display()
+    display_lint_messages(lint_messages)
@@ -84,11 +84,9 @@ if __name__ == "__main__":
     if args.user and not in_conda and not in_virtualenv:
         pip_args.append("--user")
 
-    if args.requirement:
-        pip_args.extend(["-r", args.requirement])
-
-    pip_args.extend(args.packages)
-
+    # Split each package spec once, both to check that it pins a version and
+    # to find the packages that must be built from source
+    no_binary_args = []
     for package in args.packages:
         package_name, _, version = package.partition("=")
         if not version:
@@ -97,7 +95,13 @@ if __name__ == "__main__":
                 "Please specify a version to produce a consistent linting experience."
             )
         if args.no_black_binary and "black" in package_name:
-            pip_args.append(f"--no-binary={package_name}")
+            no_binary_args.append(f"--no-binary={package_name}")
+
+    if args.requirement:
+        pip_args.extend(["-r", args.requirement])
+
+    pip_args.extend(args.packages)
+    pip_args.extend(no_binary_args)
 
     dry_run = args.dry_run == "1"
     if dry_run:
@@ -2,18 +2,23 @@ from __future__ import annotations
 
 import argparse
 import logging
-import re
 import subprocess
 import sys
 from typing import Pattern
 
 import lintrunner_adapters
-from lintrunner_adapters import LintMessage, LintSeverity, run_command
+from lintrunner_adapters import (
+    LintMessage,
+    LintSeverity,
+    compile_regex,
+    run_command,
+    to_int,
+)
 
 LINTER_CODE = "PYLINT"
 
 # adapters/pylint_linter.py:1:0: C0114: Missing module docstring (missing-module-docstring)
-RESULTS_RE: Pattern[str] = re.compile(
+RESULTS_RE: Pattern[str] = compile_regex(
     r"""(?mx)
     ^
     (?P<file>.*?):
@@ -158,9 +163,9 @@ def check_files(
             description=format_lint_messages(
                 match["message"], match["code"], match["string_code"], show_disable
             ),
-            line=int(match["line"]),
+            line=to_int(match["line"]),
             char=(
-                int(match["column"])
+                to_int(match["column"])
                 if match["column"] is not None and not match["column"].startswith("-")
                 else None
             ),
@@ -217,8 +222,7 @@ def main() -> None:
         retries=args.retries,
         show_disable=args.show_disable,
     )
-    for lint_message in lint_messages:
-        lint_message.display()
+    lintrunner_adapters.display_lint_messages(lint_messages)
 
 
 if __name__ == "__main__":
@@ -4,14 +4,20 @@ from __future__ import annotations
 
 import argparse
 import concurrent.futures
+import functools
 import logging
-import os
 import sys
 
 from pyupgrade._data import Settings
 from pyupgrade._main import _fix_plugins, _fix_tokens
 
-from lintrunner_adapters import LintMessage, LintSeverity, add_default_options
+from lintrunner_adapters import (
+    LintMessage,
+    LintSeverity,
+    add_default_options,
+    available_cpu_count,
+    display_lint_messages,
+)
 
 LINTER_CODE = "PYUPGRADE"
 
@@ -33,25 +39,18 @@ def format_error_message(filename: str, err: Exception) -> LintMessage:
 def check_file(
     filename: str,
     *,
-    min_version: tuple[int, ...],
-    keep_percent_format: bool,
-    keep_mock: bool,
-    keep_runtime_typing: bool,
+    settings: Settings,
 ) -> list[LintMessage]:
     with open(filename, "rb") as fb:
         contents_bytes = fb.read()
 
+    # Empty files (e.g. most __init__.py files) cannot be upgraded
+    if not contents_bytes:
+        return []
+
     try:
         original = replacement = contents_bytes.decode("utf-8")
-        replacement = _fix_plugins(
-            replacement,
-            settings=Settings(
-                min_version=min_version,
-                keep_percent_format=keep_percent_format,
-                keep_mock=keep_mock,
-                keep_runtime_typing=keep_runtime_typing,
-            ),
-        )
+        replacement = _fix_plugins(replacement, settings=settings)
         replacement = _fix_tokens(replacement)
 
         if original == replacement:
@@ -141,27 +140,27 @@ def main() -> None:
         stream=sys.stderr,
     )
 
-    with concurrent.futures.ThreadPoolExecutor(
-        max_workers=os.cpu_count(),
-        thread_name_prefix="Thread",
-    ) as executor:
-        futures = {
-            executor.submit(
-                check_file,
-                x,
-                min_version=args.min_version,
-                keep_percent_format=args.keep_percent_format,
-                keep_mock=args.keep_mock,
-                keep_runtime_typing=args.keep_runtime_typing,
-            ): x
-            for x in args.filenames
-        }
-        for future in concurrent.futures.as_completed(futures):
+    settings = Settings(
+        min_version=args.min_version,
+        keep_percent_format=args.keep_percent_format,
+        keep_mock=args.keep_mock,
+        keep_runtime_typing=args.keep_runtime_typing,
+    )
+
+    # pyupgrade is pure Python and CPU bound, so use processes to avoid the GIL
+    max_workers = available_cpu_count()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(
+            functools.partial(check_file, settings=settings),
+            args.filenames,
+            # Send files in batches to amortize the inter-process communication
+            chunksize=max(1, len(args.filenames) // (max_workers * 4)),
+        )
+        for filename in args.filenames:
             try:
-                for lint_message in future.result():
-                    lint_message.display()
+                display_lint_messages(next(results))
             except Exception:
-                logging.critical('Failed at "%s".', futures[future])
+                logging.critical('Failed at "%s".', filename)
                 raise
 
 
@@ -5,23 +5,29 @@ from __future__ import annotations
 import argparse
 import logging
 import re
+import subprocess
 import sys
 import textwrap
+from typing import Iterator
 
-from lintrunner_adapters import LintMessage, LintSeverity, add_default_options
-from lintrunner_adapters._common.lintrunner_common import run_command
+from lintrunner_adapters import (
+    LintMessage,
+    LintSeverity,
+    add_default_options,
+    to_int,
+)
 
 LINTER_CODE = "REFURB"
 
+# Matched against each raw line of refurb's output with fullmatch so that only
+# the fields that end up in a LintMessage need to be decoded.
 RESULTS_RE = re.compile(
-    r"""(?mx)
-        ^
+    rb"""(?x)
         (?P<file>.*?):
         (?P<line>\d+):
         (?:(?P<column>-?\d+))?
         (?:\s\[(?P<code>.*)\]:)?
         \s(?P<message>.*)
-        $
         """
 )
 
@@ -29,17 +35,17 @@ RESULTS_RE = re.compile(
 def _test_results_re() -> None:
     """Doctests.
 
-    >>> def t(s): return RESULTS_RE.search(s).groupdict()
+    >>> def t(s): return RESULTS_RE.fullmatch(s).groupdict()
 
-    >>> t(r"main.py:3:17 [FURB109]: Use `in (x, y, z)` instead of `in [x, y, z]`")
+    >>> t(rb"main.py:3:17 [FURB109]: Use `in (x, y, z)` instead of `in [x, y, z]`")
     ... # doctest: +NORMALIZE_WHITESPACE
-    {'file': 'main.py', 'line': '3', 'column': '17', 'code': 'FURB109',
-     'message': 'Use `in (x, y, z)` instead of `in [x, y, z]`'}
+    {'file': b'main.py', 'line': b'3', 'column': b'17', 'code': b'FURB109',
+     'message': b'Use `in (x, y, z)` instead of `in [x, y, z]`'}
 
-    >>> t(r"main.py:4:5 [FURB101]: Use `y = Path(x).read_text()` instead of `with open(x, ...) as f: y = f.read()`")
+    >>> t(rb"main.py:4:5 [FURB101]: Use `y = Path(x).read_text()` instead of `with open(x, ...) as f: y = f.read()`")
     ... # doctest: +NORMALIZE_WHITESPACE
-    {'file': 'main.py', 'line': '4', 'column': '5', 'code': 'FURB101',
-     'message': 'Use `y = Path(x).read_text()` instead of `with open(x, ...) as f: y = f.read()`'}
+    {'file': b'main.py', 'line': b'4', 'column': b'5', 'code': b'FURB101',
+     'message': b'Use `y = Path(x).read_text()` instead of `with open(x, ...) as f: y = f.read()`'}
     """
     pass
 
@@ -65,51 +71,55 @@ def check_files(
     severities: dict[str, LintSeverity],
     *,
     config_file: str,
-    retries: int,
     show_disable: bool,
-) -> list[LintMessage]:
+) -> Iterator[LintMessage]:
+    # Read refurb's output as it is written instead of waiting for it to exit.
+    args = [sys.executable, "-mrefurb", "--config-file", config_file, *filenames]
+    logging.debug("$ %s", " ".join(args))
     try:
-        proc = run_command(
-            [sys.executable, "-mrefurb", "--config-file", config_file, *filenames],
-            retries=retries,
-        )
+        proc = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
     except OSError as err:
-        return [
-            LintMessage(
-                path=None,
-                line=None,
-                char=None,
-                code=LINTER_CODE,
-                severity=LintSeverity.ERROR,
-                name="command-failed",
-                original=None,
-                replacement=None,
-                description=(f"Failed due to {err.__class__.__name__}:\n{err}"),
-            )
-        ]
-    stdout = str(proc.stdout, "utf-8").strip()
-    return [
-        LintMessage(
-            path=match["file"],
-            name=match["code"] or "note",
-            description=format_lint_message(
-                match["message"],
-                match["code"],
-                show_disable,
-            ),
-            line=int(match["line"]),
-            char=(
-                int(match["column"])
-                if match["column"] is not None and not match["column"].startswith("-")
-                else None
-            ),
+        yield LintMessage(
+            path=None,
+            line=None,
+            char=None,
             code=LINTER_CODE,
-            severity=severities.get(match["code"], LintSeverity.ADVICE),
+            severity=LintSeverity.ERROR,
+            name="command-failed",
             original=None,
             replacement=None,
+            description=(f"Failed due to {err.__class__.__name__}:\n{err}"),
         )
-        for match in RESULTS_RE.finditer(stdout)
-    ]
+        return
+    with proc:
+        assert proc.stdout is not None
+        for output_line in proc.stdout:
+            match = RESULTS_RE.fullmatch(output_line.strip())
+            if match is None:
+                continue
+            file, line, column, code, message = match.group(
+                "file", "line", "column", "code", "message"
+            )
+            code_str = code.decode("utf-8") if code is not None else ""
+            yield LintMessage(
+                path=file.decode("utf-8"),
+                name=code_str or "note",
+                description=format_lint_message(
+                    message.decode("utf-8"),
+                    code_str,
+                    show_disable,
+                ),
+                line=to_int(line),
+                char=(
+                    to_int(column)
+                    if column is not None and not column.startswith(b"-")
+                    else None
+                ),
+                code=LINTER_CODE,
+                severity=severities.get(code_str, LintSeverity.ADVICE),
+                original=None,
+                replacement=None,
+            )
 
 
 def main() -> None:
@@ -156,14 +166,12 @@ def main() -> None:
             assert len(parts) == 2, f"invalid severity `{severity}`"
             severities[parts[0]] = LintSeverity(parts[1])
 
-    lint_messages = check_files(
+    for lint_message in check_files(
         args.filenames,
         severities,
         config_file=args.config_file,
-        retries=args.retries,
         show_disable=args.show_disable,
-    )
-    for lint_message in lint_messages:
+    ):
         lint_message.display()
 
 
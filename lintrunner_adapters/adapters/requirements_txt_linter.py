@@ -23,69 +23,119 @@ from __future__ import annotations
 
 import argparse
 import concurrent.futures
+import io
 import logging
-import os
 import re
 import sys
-from typing import IO
 
-from lintrunner_adapters import LintMessage, LintSeverity, add_default_options
+from lintrunner_adapters import (
+    LintMessage,
+    LintSeverity,
+    add_default_options,
+    as_completed_bounded,
+    available_cpu_count,
+    display_lint_messages,
+)
 
 LINTER_CODE = "REQUIREMENTS-TXT"
 
 
 class Requirement:
-    UNTIL_COMPARISON = re.compile(b"={2,3}|!=|~=|>=?|<=?")
     UNTIL_SEP = re.compile(rb"[^;\s]+")
+    # The start of UNTIL_SEP, stopping before the first ==, ===, !=, ~=, >, >=, < or <=
+    UNTIL_SEP_OR_COMPARISON = re.compile(rb"(?=[^;\s])(?:[^;\s=!~<>]|[=!~](?!=))*")
 
     def __init__(self) -> None:
-        self.value: bytes | None = None
+        # Lines of the value; joined lazily so that long continuations stay linear
+        self._value_lines: list[bytes] = []
         self.comments: list[bytes] = []
 
+    @property
+    def value(self) -> bytes | None:
+        if not self._value_lines:
+            return None
+        if len(self._value_lines) > 1:
+            self._value_lines = [b"".join(self._value_lines)]
+        return self._value_lines[0]
+
+    @value.setter
+    def value(self, value: bytes) -> None:
+        self._value_lines = [value]
+
     @property
     def name(self) -> bytes:
         assert self.value is not None, self.value
-        name = self.value.lower()
-        for egg in (b"#egg=", b"&egg="):
-            if egg in self.value:
-                return name.partition(egg)[-1]
+        return self.parse_name(self.value)
 
-        m = self.UNTIL_SEP.match(name)
-        assert m is not None
+    @classmethod
+    def parse_name(cls, value: bytes) -> bytes:
+        for egg in (b"#egg=", b"&egg="):
+            if egg in value:
+                return value.lower().partition(egg)[-1]
 
-        name = m.group()
-        m = self.UNTIL_COMPARISON.search(name)
+        m = cls.UNTIL_SEP_OR_COMPARISON.match(value)
         if not m:
-            return name
+            # e.g. indented lines, which have no name to sort by
+            return value.lower()
 
-        return name[: m.start()]
+        return m.group().lower()
 
-    def __lt__(self, requirement: Requirement) -> bool:
-        # \n means top of file comment, so always return True,
-        # otherwise just do a string comparison with value.
+    def sort_key(self) -> tuple[bool, bytes]:
+        # \n means top of file comment, so always sort it first,
+        # otherwise just do a string comparison with the name.
         assert self.value is not None, self.value
         if self.value == b"\n":
-            return True
-        if requirement.value == b"\n":
-            return False
-        return self.name < requirement.name
+            return (False, b"")
+        return (True, self.name)
 
     def is_complete(self) -> bool:
-        return self.value is not None and not self.value.rstrip(b"\r\n").endswith(b"\\")
+        # Value lines are never blank, so only the last one can end the value
+        return bool(self._value_lines) and not self._value_lines[-1].rstrip(
+            b"\r\n"
+        ).endswith(b"\\")
 
     def append_value(self, value: bytes) -> None:
-        if self.value is not None:
-            self.value += value
-        else:
-            self.value = value
+        self._value_lines.append(value)
+
 
+def is_sorted(lines: list[bytes]) -> bool:
+    """Return whether fix_requirements would leave `lines` unchanged.
 
-def fix_requirements(f: IO[bytes]) -> bytes:
+    Only files with one requirement per line are recognized; anything else is
+    left to the full fixer.
+    """
+    previous_name = b""
+    for line in lines:
+        stripped = line.strip()
+        if not stripped and not previous_name and line != b"\n":
+            # A blank line ending the top of file comment is normalized to \n
+            return False
+        if not stripped or stripped.startswith(b"#"):
+            continue
+        if (
+            stripped.endswith(b"\\")
+            or line == b"pkg-resources==0.0.0\n"
+            or not Requirement.UNTIL_SEP.match(line)
+        ):
+            return False
+        name = Requirement.parse_name(line)
+        if name < previous_name:
+            return False
+        previous_name = name
+    return True
+
+
+def fix_requirements(contents: bytes) -> bytes:
     requirements: list[Requirement] = []
-    before = list(f)
+    # Unlike bytes.splitlines(), this only splits on b"\n", like iterating a file
+    before = io.BytesIO(contents).readlines()
     after: list[bytes] = []
 
-    before_string = b"".join(before)
+    before_string = contents
+
+    # Files are usually sorted already, so skip building the requirements
+    if contents.endswith(b"\n") and is_sorted(before):
+        return contents
 
     # adds new line in case one is missing
     # AND a change to the requirements file is needed regardless:
@@ -126,7 +176,8 @@ def fix_requirements(f: IO[bytes]) -> bytes:
         req for req in requirements if req.value != b"pkg-resources==0.0.0\n"
     ]
 
-    for requirement in sorted(requirements):
+    # Compute each name once instead of on every comparison
+    for requirement in sorted(requirements, key=Requirement.sort_key):
         after.extend(requirement.comments)
         assert requirement.value, requirement.value
         after.append(requirement.value)
@@ -140,8 +191,7 @@ def fix_requirements(f: IO[bytes]) -> bytes:
 def check_file(filename: str) -> list[LintMessage]:
     with open(filename, "rb") as f:
         original = f.read()
-    with open(filename, "rb") as f:
-        replacement = fix_requirements(f)
+    replacement = fix_requirements(original)
 
     if original == replacement:
         return []
@@ -154,8 +204,8 @@ def check_file(filename: str) -> list[LintMessage]:
             code=LINTER_CODE,
             severity=LintSeverity.WARNING,
             name="format",
-            original=original.decode("utf-8"),
-            replacement=replacement.decode("utf-8"),
+            original=original,
+            replacement=replacement,
             description="Run `lintrunner -a` to apply this patch.",
         )
     ]
@@ -181,17 +231,18 @@ def main() -> None:
         stream=sys.stderr,
     )
 
+    max_workers = available_cpu_count()
     with concurrent.futures.ThreadPoolExecutor(
-        max_workers=os.cpu_count(),
+        max_workers=max_workers,
         thread_name_prefix="Thread",
     ) as executor:
-        futures = {executor.submit(check_file, x): x for x in args.filenames}
-        for future in concurrent.futures.as_completed(futures):
+        for filename, future in as_completed_bounded(
+            executor, check_file, args.filenames, max_in_flight=2 * max_workers
+        ):
             try:
-                for lint_message in future.result():
-                    lint_message.display()
+                display_lint_messages(future.result())
             except Exception:
-                logging.critical('Failed at "%s".', futures[future])
+                logging.critical('Failed at "%s".', filename)
                 raise
 
 
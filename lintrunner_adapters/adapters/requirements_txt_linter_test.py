@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import io
+import unittest
+
+import requirements_txt_linter
+
+
+def lines(contents: bytes) -> list[bytes]:
+    return io.BytesIO(contents).readlines()
+
+
+class TestIsSorted(unittest.TestCase):
+    def test_it_accepts_sorted_requirements(self) -> None:
+        contents = b"# comment\n\nattrs==22.1.0\nBlack>=22\n# pinned\nnumpy\n"
+        self.assertTrue(requirements_txt_linter.is_sorted(lines(contents)))
+        self.assertEqual(requirements_txt_linter.fix_requirements(contents), contents)
+
+    def test_it_rejects_unsorted_requirements(self) -> None:
+        contents = b"numpy\nattrs==22.1.0\n"
+        self.assertFalse(requirements_txt_linter.is_sorted(lines(contents)))
+        self.assertEqual(
+            requirements_txt_linter.fix_requirements(contents),
+            b"attrs==22.1.0\nnumpy\n",
+        )
+
+    def test_it_sorts_names_not_versions(self) -> None:
+        # "foo" sorts before "foo-bar" even though "=" sorts after "-"
+        contents = b"foo==1.0\nfoo-bar==1.0\n"
+        self.assertTrue(requirements_txt_linter.is_sorted(lines(contents)))
+        self.assertEqual(requirements_txt_linter.fix_requirements(contents), contents)
+
+    def test_it_leaves_continuation_lines_to_the_fixer(self) -> None:
+        contents = b"attrs==22.1.0 \\\n    --hash=sha256:abc\nnumpy\n"
+        self.assertFalse(requirements_txt_linter.is_sorted(lines(contents)))
+
+    def test_it_leaves_indented_lines_to_the_fixer(self) -> None:
+        self.assertFalse(requirements_txt_linter.is_sorted(lines(b"  attrs\nnumpy\n")))
+
+    def test_it_leaves_pkg_resources_to_the_fixer(self) -> None:
+        contents = b"attrs\npkg-resources==0.0.0\n"
+        self.assertFalse(requirements_txt_linter.is_sorted(lines(contents)))
+        self.assertEqual(requirements_txt_linter.fix_requirements(contents), b"attrs\n")
+
+    def test_it_leaves_blank_lines_with_whitespace_before_requirements_to_the_fixer(
+        self,
+    ) -> None:
+        contents = b"# comment\n \nattrs\n"
+        self.assertFalse(requirements_txt_linter.is_sorted(lines(contents)))
+        self.assertEqual(
+            requirements_txt_linter.fix_requirements(contents),
+            b"# comment\n\nattrs\n",
+        )
+
+    def test_it_does_not_split_lines_on_carriage_returns(self) -> None:
+        contents = b"numpy\rattrs\n"
+        self.assertEqual(requirements_txt_linter.fix_requirements(contents), contents)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,95 +3,15 @@
 from __future__ import annotations
 
 import argparse
-import concurrent.futures
 import logging
-import os
-import subprocess
 import sys
 
-from lintrunner_adapters import (
-    LintMessage,
-    LintSeverity,
-    add_default_options,
-    as_posix,
-    run_command,
-)
+from lintrunner_adapters import add_default_options
+from lintrunner_adapters._common.ruff_fix import add_fix_options, display_fixes
 
 LINTER_CODE = "RUFF-FIX"
 
 
-def check_file(
-    filename: str,
-    *,
-    config: str | None,
-    retries: int,
-    timeout: int,
-) -> list[LintMessage]:
-    try:
-        with open(filename, "rb") as f:
-            original = f.read()
-        with open(filename, "rb") as f:
-            proc_fix = run_command(
-                [
-                    sys.executable,
-                    "-m",
-                    "ruff",
-                    "check",
-                    "--fix-only",
-                    "--exit-zero",
-                    *([f"--config={config}"] if config else []),
-                    "--stdin-filename",
-                    filename,
-                    "-",
-                ],
-                stdin=f,
-                retries=retries,
-                timeout=timeout,
-                check=True,
-            )
-    except (OSError, subprocess.CalledProcessError) as err:
-        return [
-            LintMessage(
-                path=None,
-                line=None,
-                char=None,
-                code=LINTER_CODE,
-                severity=LintSeverity.ERROR,
-                name="command-failed",
-                original=None,
-                replacement=None,
-                description=(
-                    f"Failed due to {err.__class__.__name__}:\n{err}"
-                    if not isinstance(err, subprocess.CalledProcessError)
-                    else (
-                        f"COMMAND (exit code {err.returncode})\n"
-                        f"{' '.join(as_posix(x) for x in err.cmd)}\n\n"
-                        f"STDERR\n{err.stderr.decode('utf-8').strip() or '(empty)'}\n\n"
-                        f"STDOUT\n{err.stdout.decode('utf-8').strip() or '(empty)'}"
-                    )
-                ),
-            )
-        ]
-
-    replacement = proc_fix.stdout
-    if original == replacement:
-        return []
-
-    return [
-        LintMessage(
-            path=filename,
-            name="format",
-            description="Run `lintrunner -a` to apply this patch.",
-            line=None,
-            char=None,
-            code=LINTER_CODE,
-            severity=LintSeverity.WARNING,
-            original=original.decode("utf-8"),
-            replacement=replacement.decode("utf-8"),
-        )
-    ]
-
-
 def main() -> None:
     parser = argparse.ArgumentParser(
         description=f"Ruff autofix formatter. Linter code: {LINTER_CODE}. Use with RUFF to get lint messages.",
@@ -109,6 +29,7 @@ def main() -> None:
         type=int,
         help="Seconds to wait for ruff",
     )
+    add_fix_options(parser)
     add_default_options(parser)
     args = parser.parse_args()
 
@@ -124,27 +45,16 @@ def main() -> None:
         stream=sys.stderr,
     )
 
-    with concurrent.futures.ThreadPoolExecutor(
-        max_workers=os.cpu_count(),
-        thread_name_prefix="Thread",
-    ) as executor:
-        futures = {
-            executor.submit(
-                check_file,
-                path,
-                config=args.config,
-                retries=args.retries,
-                timeout=args.timeout,
-            ): path
-            for path in args.filenames
-        }
-        for future in concurrent.futures.as_completed(futures):
-            try:
-                for lint_message in future.result():
-                    lint_message.display()
-            except Exception:
-                logging.critical('Failed at "%s".', futures[future])
-                raise
+    display_fixes(
+        args.filenames,
+        linter_code=LINTER_CODE,
+        config=args.config,
+        retries=args.retries,
+        timeout=args.timeout,
+        pool=args.pool,
+        batch_size=args.batch_size,
+        jobs=args.jobs,
+    )
 
 
 if __name__ == "__main__":
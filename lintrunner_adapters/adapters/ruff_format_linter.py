@@ -5,7 +5,6 @@ from __future__ import annotations
 import argparse
 import concurrent.futures
 import logging
-import os
 import subprocess
 import sys
 
@@ -14,6 +13,9 @@ from lintrunner_adapters import (
     LintSeverity,
     add_default_options,
     as_posix,
+    available_cpu_count,
+    display_lint_messages,
+    ruff_command,
     run_command,
 )
 
@@ -30,23 +32,20 @@ def check_file(
     try:
         with open(filename, "rb") as f:
             original = f.read()
-        with open(filename, "rb") as f:
-            proc_fix = run_command(
-                [
-                    sys.executable,
-                    "-m",
-                    "ruff",
-                    "format",
-                    *([f"--config={config}"] if config else []),
-                    "--stdin-filename",
-                    filename,
-                    "-",
-                ],
-                stdin=f,
-                retries=retries,
-                timeout=timeout,
-                check=True,
-            )
+        proc_fix = run_command(
+            [
+                *ruff_command(),
+                "format",
+                *([f"--config={config}"] if config else []),
+                "--stdin-filename",
+                filename,
+                "-",
+            ],
+            input=original,
+            retries=retries,
+            timeout=timeout,
+            check=True,
+        )
     except (OSError, subprocess.CalledProcessError) as err:
         return [
             LintMessage(
@@ -84,8 +83,8 @@ def check_file(
             char=None,
             code=LINTER_CODE,
             severity=LintSeverity.WARNING,
-            original=original.decode("utf-8"),
-            replacement=replacement.decode("utf-8"),
+            original=original,
+            replacement=replacement,
         )
     ]
 
@@ -123,7 +122,7 @@ def main() -> None:
     )
 
     with concurrent.futures.ThreadPoolExecutor(
-        max_workers=os.cpu_count(),
+        max_workers=available_cpu_count(),
         thread_name_prefix="Thread",
     ) as executor:
         futures = {
@@ -138,8 +137,7 @@ def main() -> None:
         }
         for future in concurrent.futures.as_completed(futures):
             try:
-                for lint_message in future.result():
-                    lint_message.display()
+                display_lint_messages(future.result())
             except Exception:
                 logging.critical('Failed at "%s".', futures[future])
                 raise
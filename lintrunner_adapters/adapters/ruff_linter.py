@@ -3,68 +3,92 @@
 from __future__ import annotations
 
 import argparse
-import concurrent.futures
-import json
+import functools
 import logging
-import os
 import subprocess
 import sys
+from typing import Any
 
 from lintrunner_adapters import (
     LintMessage,
     LintSeverity,
     add_default_options,
     as_posix,
+    display_lint_messages,
+    json_loads,
+    ruff_command,
     run_command,
 )
+from lintrunner_adapters._common.ruff_fix import add_fix_options, display_fixes
 
 LINTER_CODE = "RUFF"
 
 
-def explain_rule(code: str) -> str:
-    proc = run_command(
-        ["ruff", "rule", "--format=json", code],
-        check=True,
-    )
-    rule = json.loads(str(proc.stdout, "utf-8").strip())
+def format_rule(rule: dict[str, Any]) -> str:
     text = f"\n{rule['linter']}: {rule['summary']}"
     if "explanation" in rule:
         text += f"\n\n{rule['explanation']}"
     return text
 
 
-def get_issue_severity(code: str) -> LintSeverity:
-    # "B901": `return x` inside a generator
-    # "B902": Invalid first argument to a method
-    # "B903": __slots__ efficiency
-    # "B950": Line too long
-    # "C4": Flake8 Comprehensions
-    # "C9": Cyclomatic complexity
-    # "E2": PEP8 horizontal whitespace "errors"
-    # "E3": PEP8 blank line "errors"
-    # "E5": PEP8 line length "errors"
-    # "T400": type checking Notes
-    # "T49": internal type checker errors or unmatched messages
-    if any(
-        code.startswith(x)
-        for x in (
-            "B9",
-            "C4",
-            "C9",
-            "E2",
-            "E3",
-            "E5",
-            "T400",
-            "T49",
-            "PLC",
-            "PLR",
+@functools.lru_cache(maxsize=None)
+def explain_all_rules() -> dict[str, str]:
+    """Explain every rule with a single ruff invocation.
+
+    Returns an empty dict if this version of ruff does not support `--all`.
+    """
+    try:
+        proc = run_command(
+            [*ruff_command(), "rule", "--all", "--output-format=json"],
+            check=True,
         )
-    ):
+    except (OSError, subprocess.CalledProcessError):
+        return {}
+    return {rule["code"]: format_rule(rule) for rule in json_loads(proc.stdout)}
+
+
+@functools.lru_cache(maxsize=None)
+def explain_rule(code: str) -> str:
+    explanation = explain_all_rules().get(code)
+    if explanation is not None:
+        return explanation
+    proc = run_command(
+        [*ruff_command(), "rule", "--format=json", code],
+        check=True,
+    )
+    return format_rule(json_loads(proc.stdout))
+
+
+# "B901": `return x` inside a generator
+# "B902": Invalid first argument to a method
+# "B903": __slots__ efficiency
+# "B950": Line too long
+# "C4": Flake8 Comprehensions
+# "C9": Cyclomatic complexity
+# "E2": PEP8 horizontal whitespace "errors"
+# "E3": PEP8 blank line "errors"
+# "E5": PEP8 line length "errors"
+# "T400": type checking Notes
+# "T49": internal type checker errors or unmatched messages
+ADVICE_PREFIXES = frozenset(
+    ("B9", "C4", "C9", "E2", "E3", "E5", "T400", "T49", "PLC", "PLR")
+)
+
+# "F821": Undefined name
+# "E999": syntax error
+ERROR_PREFIXES = frozenset(("F821", "E999", "PLE"))
+
+# The lengths of all prefixes above
+PREFIX_LENGTHS = frozenset(map(len, ADVICE_PREFIXES | ERROR_PREFIXES))
+
+
+def get_issue_severity(code: str) -> LintSeverity:
+    # A code starts with a prefix if its first len(prefix) characters are one
+    prefixes = [code[:length] for length in PREFIX_LENGTHS]
+    if not ADVICE_PREFIXES.isdisjoint(prefixes):
         return LintSeverity.ADVICE
 
-    # "F821": Undefined name
-    # "E999": syntax error
-    if any(code.startswith(x) for x in ("F821", "E999", "PLE")):
+    if not ERROR_PREFIXES.isdisjoint(prefixes):
         return LintSeverity.ERROR
 
     # "F": PyFlakes Error
@@ -75,6 +99,13 @@ def get_issue_severity(code: str) -> LintSeverity:
     return LintSeverity.WARNING
 
 
+def format_lint_message_simple(message: str, url: str | None) -> str:
+    """Same as format_lint_message without rule explanations or disable hints."""
+    if url is not None:
+        return f"{message}.\nSee {url}"
+    return message
+
+
 def format_lint_message(
     message: str, code: str, rules: dict[str, str], show_disable: bool, url: str | None
 ) -> str:
@@ -96,17 +127,16 @@ def check_files(
     timeout: int,
     explain: bool,
     show_disable: bool,
-) -> list[LintMessage]:
+) -> tuple[list[LintMessage], set[str]]:
+    """Lint `filenames` and return the lint messages and the files with fixes."""
     try:
         proc = run_command(
             [
-                sys.executable,
-                "-m",
-                "ruff",
+                *ruff_command(),
                 "check",
                 "--exit-zero",
                 "--quiet",
-                "--output-format=json",
+                "--output-format=json-lines",
                 *([f"--config={config}"] if config else []),
                 *filenames,
             ],
@@ -130,117 +160,65 @@ def check_files(
                     if not isinstance(err, subprocess.CalledProcessError)
                     else (
                         f"COMMAND (exit code {err.returncode})\n"
-                        f"{' '.join(as_posix(x) for x in err.cmd)}\n\n"
+                        f"{' '.join(map(as_posix, err.cmd))}\n\n"
                         f"STDERR\n{err.stderr.decode('utf-8').strip() or '(empty)'}\n\n"
                         f"STDOUT\n{err.stdout.decode('utf-8').strip() or '(empty)'}"
                     )
                 ),
             )
-        ]
-
-    stdout = str(proc.stdout, "utf-8").strip()
-    vulnerabilities = json.loads(stdout)
-
-    if explain:
-        all_codes = {v["code"] for v in vulnerabilities}
-        rules = {code: explain_rule(code) for code in all_codes}
-    else:
-        rules = {}
-
-    return [
-        LintMessage(
-            path=vuln["filename"],
-            name=vuln["code"],
-            description=(
-                format_lint_message(
-                    vuln["message"],
-                    vuln["code"],
-                    rules,
-                    show_disable,
-                    vuln.get("url"),
-                )
-            ),
-            line=int(vuln["location"]["row"]),
-            char=int(vuln["location"]["column"]),
-            code=LINTER_CODE,
-            severity=severities.get(vuln["code"], get_issue_severity(vuln["code"])),
-            original=None,
-            replacement=None,
-        )
-        for vuln in vulnerabilities
-    ]
-
+        ], set()
 
-def check_file_for_fixes(
-    filename: str,
-    *,
-    config: str | None,
-    retries: int,
-    timeout: int,
-) -> list[LintMessage]:
-    try:
-        with open(filename, "rb") as f:
-            original = f.read()
-        with open(filename, "rb") as f:
-            proc_fix = run_command(
-                [
-                    sys.executable,
-                    "-m",
-                    "ruff",
-                    "check",
-                    "--fix-only",
-                    "--exit-zero",
-                    *([f"--config={config}"] if config else []),
-                    "--stdin-filename",
-                    filename,
-                    "-",
-                ],
-                stdin=f,
-                retries=retries,
-                timeout=timeout,
-                check=True,
-            )
-    except (OSError, subprocess.CalledProcessError) as err:
-        return [
+    rules: dict[str, str] = {}
+    # Only files with a fixable violation need the fix pass
+    files_with_fixes: set[str] = set()
+    # Each decoded line has its own copy of the code and file name. Share one
+    # copy of each among the lint messages instead.
+    shared_strings: dict[str, str] = {}
+    # Resolve the severity of each code once, starting from the user overrides
+    resolved_severities = dict(severities)
+    # Neither rule explanations nor disable hints by default, so most runs only
+    # need to append the url
+    simple = not explain and not show_disable
+    lint_messages = []
+    # One diagnostic per line, so only one decoded diagnostic is alive at a time.
+    # Both decoders accept bytes, which saves decoding a copy of the output.
+    for line in proc.stdout.splitlines():
+        if not line:
+            continue
+        vuln = json_loads(line)
+        code = shared_strings.setdefault(vuln["code"], vuln["code"])
+        path = shared_strings.setdefault(vuln["filename"], vuln["filename"])
+        severity = resolved_severities.get(code)
+        if severity is None:
+            severity = resolved_severities[code] = get_issue_severity(code)
+        if explain and code not in rules:
+            rules[code] = explain_rule(code)
+        if vuln.get("fix"):
+            files_with_fixes.add(path)
+        lint_messages.append(
             LintMessage(
-                path=None,
-                line=None,
-                char=None,
-                code=LINTER_CODE,
-                severity=LintSeverity.ERROR,
-                name="command-failed",
-                original=None,
-                replacement=None,
+                path=path,
+                name=code,
                 description=(
-                    f"Failed due to {err.__class__.__name__}:\n{err}"
-                    if not isinstance(err, subprocess.CalledProcessError)
-                    else (
-                        f"COMMAND (exit code {err.returncode})\n"
-                        f"{' '.join(as_posix(x) for x in err.cmd)}\n\n"
-                        f"STDERR\n{err.stderr.decode('utf-8').strip() or '(empty)'}\n\n"
-                        f"STDOUT\n{err.stdout.decode('utf-8').strip() or '(empty)'}"
+                    format_lint_message_simple(vuln["message"], vuln.get("url"))
+                    if simple
+                    else format_lint_message(
+                        vuln["message"],
+                        code,
+                        rules,
+                        show_disable,
+                        vuln.get("url"),
                     )
                 ),
+                line=vuln["location"]["row"],
+                char=vuln["location"]["column"],
+                code=LINTER_CODE,
+                severity=severity,
+                original=None,
+                replacement=None,
             )
-        ]
-
-    replacement = proc_fix.stdout
-    if original == replacement:
-        return []
-
-    return [
-        LintMessage(
-            path=filename,
-            name="format",
-            description="Run `lintrunner -a` to apply this patch.",
-            line=None,
-            char=None,
-            code=LINTER_CODE,
-            severity=LintSeverity.WARNING,
-            original=original.decode("utf-8"),
-            replacement=replacement.decode("utf-8"),
         )
-    ]
+    return lint_messages, files_with_fixes
 
 
 def main() -> None:
@@ -279,6 +257,7 @@ def main() -> None:
         action="store_true",
         help="Do not suggest fixes",
     )
+    add_fix_options(parser)
     add_default_options(parser, retries=1)
     args = parser.parse_args()
 
@@ -301,7 +280,7 @@ def main() -> None:
             assert len(parts) == 2, f"invalid severity `{severity}`"
             severities[parts[0]] = LintSeverity(parts[1])
 
-    lint_messages = check_files(
+    lint_messages, files_with_fixes = check_files(
         args.filenames,
         severities=severities,
         config=args.config,
@@ -310,35 +289,22 @@ def main() -> None:
         explain=args.explain,
         show_disable=args.show_disable,
     )
-    for lint_message in lint_messages:
-        lint_message.display()
+    display_lint_messages(lint_messages)
 
-    if args.no_fix or not lint_messages:
+    if args.no_fix or not files_with_fixes:
         # If we're not fixing, we can exit early
         return
 
-    files_with_lints = {lint.path for lint in lint_messages if lint.path is not None}
-    with concurrent.futures.ThreadPoolExecutor(
-        max_workers=os.cpu_count(),
-        thread_name_prefix="Thread",
-    ) as executor:
-        futures = {
-            executor.submit(
-                check_file_for_fixes,
-                path,
-                config=args.config,
-                retries=args.retries,
-                timeout=args.timeout,
-            ): path
-            for path in files_with_lints
-        }
-        for future in concurrent.futures.as_completed(futures):
-            try:
-                for lint_message in future.result():
-                    lint_message.display()
-            except Exception:
-                logging.critical('Failed at "%s".', futures[future])
-                raise
+    display_fixes(
+        sorted(files_with_fixes),
+        linter_code=LINTER_CODE,
+        config=args.config,
+        retries=args.retries,
+        timeout=args.timeout,
+        pool=args.pool,
+        batch_size=args.batch_size,
+        jobs=args.jobs,
+    )
 
 
 if __name__ == "__main__":
@@ -26,50 +26,47 @@ import argparse
 import concurrent.futures
 import logging
 import os
-import re
 import subprocess
 import sys
 from typing import Pattern
 
 import lintrunner_adapters
-from lintrunner_adapters import LintMessage, LintSeverity, as_posix, run_command
+from lintrunner_adapters import (
+    LintMessage,
+    LintSeverity,
+    as_posix,
+    compile_regex,
+    run_command,
+)
 
 LINTER_CODE = "RUSTFMT"
 
-SYNTAX_ERROR_ARROW_RE: Pattern[str] = re.compile(
+SYNTAX_ERROR_ARROW_RE: Pattern[str] = compile_regex(
     r"(?m)^( +--> )(.+)(:(?P<line>\d+):(?P<column>\d+))\n"
 )
 
-SYNTAX_ERROR_PARSE_RE: Pattern[str] = re.compile(r"(?m)^failed to parse .*\n")
+SYNTAX_ERROR_PARSE_RE: Pattern[str] = compile_regex(r"(?m)^failed to parse .*\n")
 
 
 def strip_path_from_error(error: str) -> str:
     # Remove full paths from the description to have deterministic messages.
-    error = SYNTAX_ERROR_ARROW_RE.sub("", error, count=1)
-    error = SYNTAX_ERROR_PARSE_RE.sub("", error, count=1)
+    # The substring checks skip the regex scans for errors that cannot match.
+    if " --> " in error:
+        error = SYNTAX_ERROR_ARROW_RE.sub("", error, count=1)
+    if "failed to parse " in error:
+        error = SYNTAX_ERROR_PARSE_RE.sub("", error, count=1)
     return error
 
 
 def check_file(
     filename: str,
     *,
-    binary: str,
-    config_path: str | None,
+    command: list[str],
 ) -> list[LintMessage]:
     try:
         with open(filename, "rb") as f:
             original = f.read()
-        with open(filename, "rb") as f:
-            proc = run_command(
-                [
-                    binary,
-                    "--emit=stdout",
-                    "--quiet",
-                ]
-                + (["--config-path", config_path] if config_path else []),
-                stdin=f,
-                check=True,
-            )
+        proc = run_command(command, input=original, check=True)
     except (OSError, subprocess.CalledProcessError) as err:
         # https://github.com/rust-lang/rustfmt#running
         # TODO: Fix the syntax error regexp to handle multiple issues and
@@ -160,13 +157,51 @@ def check_file(
             code=LINTER_CODE,
             severity=LintSeverity.WARNING,
             name="format",
-            original=original.decode("utf-8"),
-            replacement=replacement.decode("utf-8"),
+            original=original,
+            replacement=replacement,
             description="See https://github.com/rust-lang/rustfmt#tips",
         )
     ]
 
 
+def check_files(
+    filenames: list[str],
+    *,
+    command: list[str],
+    check_command: list[str],
+) -> list[LintMessage]:
+    """Run check_file on the files of `filenames` that are not formatted.
+
+    A single `rustfmt --check` run finds those files. If it reports any error,
+    all files go through check_file so that each error is reported for its file.
+    """
+    try:
+        proc = run_command([*check_command, *filenames])
+    except OSError:
+        proc = None
+    if proc is None or proc.returncode not in (0, 1) or proc.stderr.strip():
+        files_to_check = filenames
+    else:
+        # rustfmt prints absolute paths, including those of the modules the
+        # files declare, which are not ours to report
+        unformatted = {
+            os.path.normcase(path)
+            for path in proc.stdout.decode("utf-8").splitlines()
+            if path
+        }
+        files_to_check = [
+            filename
+            for filename in filenames
+            if os.path.normcase(os.path.abspath(filename)) in unformatted
+            or os.path.normcase(os.path.realpath(filename)) in unformatted
+        ]
+    return [
+        lint_message
+        for filename in files_to_check
+        for lint_message in check_file(filename, command=command)
+    ]
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(
         description="Format rust files with rustfmt. Linter code: {LINTER_CODE}",
@@ -185,6 +220,13 @@ def main() -> None:
         help="rustfmt config path",
     )
 
+    parser.add_argument(
+        "--batch-size",
+        default=32,
+        type=int,
+        help="Number of files to check with each `rustfmt --check` invocation",
+    )
+
     lintrunner_adapters.add_default_options(parser)
     args = parser.parse_args()
 
@@ -200,22 +242,32 @@ def main() -> None:
         stream=sys.stderr,
     )
 
+    # The same for every file
+    config = ["--config-path", args.config_path] if args.config_path else []
+    command = [args.binary, "--emit=stdout", "--quiet", *config]
+    check_command = [args.binary, "--check", "--files-with-diff", *config]
+
+    batches = [
+        args.filenames[i : i + args.batch_size]
+        for i in range(0, len(args.filenames), args.batch_size)
+    ]
+
+    # Threads are enough: each one waits on a rustfmt process
     with concurrent.futures.ThreadPoolExecutor(
-        max_workers=os.cpu_count(),
+        max_workers=lintrunner_adapters.available_cpu_count(),
         thread_name_prefix="Thread",
     ) as executor:
         futures = {
             executor.submit(
-                check_file, x, binary=args.binary, config_path=args.config_path
-            ): x
-            for x in args.filenames
+                check_files, batch, command=command, check_command=check_command
+            ): batch
+            for batch in batches
         }
         for future in concurrent.futures.as_completed(futures):
             try:
-                for lint_message in future.result():
-                    lint_message.display()
+                lintrunner_adapters.display_lint_messages(future.result())
             except Exception:
-                logging.critical('Failed at "%s".', futures[future])
+                logging.critical('Failed at "%s".', " ".join(futures[future]))
                 raise
 
 
@@ -5,14 +5,19 @@ from __future__ import annotations
 import argparse
 import concurrent.futures
 import logging
-import os
 import sys
 from pathlib import Path
+from typing import Any
 
 from ufmt.core import make_black_config, ufmt_string  # type: ignore[attr-defined]
 from usort import Config as UsortConfig
 
-from lintrunner_adapters import LintMessage, LintSeverity
+from lintrunner_adapters import (
+    LintMessage,
+    LintSeverity,
+    available_cpu_count,
+    display_lint_messages,
+)
 
 LINTER_CODE = "UFMT"
 
@@ -31,6 +36,20 @@ def format_error_message(filename: str, err: Exception) -> LintMessage:
     )
 
 
+# Files in the same directory share their configs, so each process looks them
+# up once per directory. The suffix is part of the key since black formats
+# .pyi files differently.
+_configs: dict[tuple[Path, str], tuple[UsortConfig, Any]] = {}
+
+
+def find_configs(path: Path) -> tuple[UsortConfig, Any]:
+    key = (path.parent, path.suffix)
+    configs = _configs.get(key)
+    if configs is None:
+        configs = _configs[key] = (UsortConfig.find(path), make_black_config(path))
+    return configs
+
+
 def check_file(
     filename: str,
 ) -> list[LintMessage]:
@@ -40,8 +59,7 @@ def check_file(
     try:
         path = Path(filename)
 
-        usort_config = UsortConfig.find(path)
-        black_config = make_black_config(path)
+        usort_config, black_config = find_configs(path)
 
         # Use UFMT API to call both usort and black
         replacement = ufmt_string(
@@ -76,6 +94,12 @@ def main() -> None:
         description=f"Format files with ufmt (black + usort). Linter code: {LINTER_CODE}",
         fromfile_prefix_chars="@",
     )
+    parser.add_argument(
+        "--jobs",
+        default=0,
+        type=int,
+        help="number of processes to run in parallel, 0 for number of CPUs",
+    )
     parser.add_argument(
         "--verbose",
         action="store_true",
@@ -100,15 +124,15 @@ def main() -> None:
         stream=sys.stderr,
     )
 
-    with concurrent.futures.ThreadPoolExecutor(
-        max_workers=os.cpu_count(),
-        thread_name_prefix="Thread",
+    # black and usort are pure Python and CPU bound, so use processes to avoid
+    # the GIL
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=args.jobs or available_cpu_count(),
     ) as executor:
         futures = {executor.submit(check_file, x): x for x in args.filenames}
         for future in concurrent.futures.as_completed(futures):
             try:
-                for lint_message in future.result():
-                    lint_message.display()
+                display_lint_messages(future.result())
             except Exception:
                 logging.critical('Failed at "%s".', futures[future])
                 raise
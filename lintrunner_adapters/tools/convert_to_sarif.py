@@ -3,9 +3,10 @@
 from __future__ import annotations
 
 import argparse
-import json
 import os
-from typing import Any, Iterable
+from typing import IO, Any, Iterable, Iterator
+
+from lintrunner_adapters import json_dumps, json_loads
 
 
 def format_rule_name(lintrunner_result: dict[str, Any]) -> str:
@@ -18,33 +19,17 @@ def severity_to_github_level(severity: str) -> str:
     return severity
 
 
-def parse_single_lintrunner_result(
-    lintrunner_result: dict[str, Any],
-) -> tuple[dict[str, Any], dict[str, Any]]:
-    r"""Parse a single lintrunner result.
-
-    A result looks like this:
-    {
-        "path":"/adapters/pytorch/grep_linter.py",
-        "line":227,
-        "char":80,
-        "code":"FLAKE8",
-        "severity":"advice",
-        "name":"E501",
-        "description":"line too long (81 > 79 characters)\nSee https://www.flake8rules.com/rules/E501.html"
-    }
-    """
-    if lintrunner_result["path"] is None:
+def build_result(
+    lintrunner_result: dict[str, Any], rule_name: str, level: str
+) -> dict[str, Any]:
+    path = lintrunner_result["path"]
+    if path is None:
         artifact_uri = None
     else:
-        artifact_uri = (
-            ("file://" + lintrunner_result["path"])
-            if lintrunner_result["path"].startswith("/")
-            else lintrunner_result["path"]
-        )
-    result = {
-        "ruleId": format_rule_name(lintrunner_result),
-        "level": severity_to_github_level(lintrunner_result["severity"]),
+        artifact_uri = ("file://" + path) if path.startswith("/") else path
+    return {
+        "ruleId": rule_name,
+        "level": level,
         "message": {
             "text": lintrunner_result["description"],
         },
@@ -63,35 +48,56 @@ def parse_single_lintrunner_result(
         ],
     }
 
-    rule = {
-        "id": format_rule_name(lintrunner_result),
-        "rule": {
-            "id": format_rule_name(lintrunner_result),
-            "name": format_rule_name(lintrunner_result),
-            "shortDescription": {"text": format_rule_name(lintrunner_result)},
-            "fullDescription": {
-                "text": format_rule_name(lintrunner_result)
-                + "\n"
-                + lintrunner_result["description"],
-            },
-            "defaultConfiguration": {
-                "level": severity_to_github_level(lintrunner_result["severity"]),
-            },
+
+def build_rule(
+    lintrunner_result: dict[str, Any], rule_name: str, level: str
+) -> dict[str, Any]:
+    return {
+        "id": rule_name,
+        "name": rule_name,
+        "shortDescription": {"text": rule_name},
+        "fullDescription": {
+            "text": rule_name + "\n" + lintrunner_result["description"],
+        },
+        "defaultConfiguration": {
+            "level": level,
         },
     }
 
-    return result, rule
+
+def build_rules(last_results: dict[str, dict[str, Any]]) -> list[dict[str, Any]]:
+    """Build each rule from the last result seen for it."""
+    return [
+        build_rule(
+            lintrunner_result,
+            rule_name,
+            severity_to_github_level(lintrunner_result["severity"]),
+        )
+        for rule_name, lintrunner_result in last_results.items()
+    ]
+
+
+def iter_results(
+    lintrunner_results: Iterable[dict[str, Any]],
+    last_results: dict[str, dict[str, Any]],
+) -> Iterator[dict[str, Any]]:
+    """Build the SARIF result of each lintrunner result.
+
+    Most results share a few rules, so instead of building a rule per result,
+    the last result seen for each rule is recorded in `last_results` for
+    build_rules.
+    """
+    for lintrunner_result in lintrunner_results:
+        rule_name = format_rule_name(lintrunner_result)
+        level = severity_to_github_level(lintrunner_result["severity"])
+        yield build_result(lintrunner_result, rule_name, level)
+        last_results[rule_name] = lintrunner_result
 
 
 def produce_sarif(lintrunner_results: Iterable[dict[str, Any]]) -> dict[str, Any]:
     """Convert the output of lintrunner json to SARIF."""
-
-    rules = {}
-    results = []
-    for lintrunner_json in lintrunner_results:
-        result, rule = parse_single_lintrunner_result(lintrunner_json)
-        results.append(result)
-        rules[rule["id"]] = rule["rule"]
+    last_results: dict[str, dict[str, Any]] = {}
+    results = list(iter_results(lintrunner_results, last_results))
 
     sarif = {
         "$schema": "https://json.schemastore.org/sarif-2.1.0.json",
@@ -101,7 +107,7 @@ def produce_sarif(lintrunner_results: Iterable[dict[str, Any]]) -> dict[str, Any
                 "tool": {
                     "driver": {
                         "name": "lintrunner",
-                        "rules": list(rules.values()),
+                        "rules": build_rules(last_results),
                     },
                 },
                 "results": results,
@@ -112,19 +118,51 @@ def produce_sarif(lintrunner_results: Iterable[dict[str, Any]]) -> dict[str, Any
     return sarif
 
 
-def main(args: Any) -> None:
-    """Convert the output of lintrunner json to SARIF."""
-    with open(args.input, encoding="utf-8") as f:
-        lintrunner_jsons = [json.loads(line) for line in f]
+def write_sarif(lintrunner_results: Iterable[dict[str, Any]], f: IO[bytes]) -> None:
+    """Write the same SARIF as produce_sarif to `f`, one result at a time.
+
+    Only the rules are kept in memory. They are written after the results,
+    which does not change the document since JSON objects are unordered.
+    """
+    last_results: dict[str, dict[str, Any]] = {}
+    f.write(
+        b'{"$schema": "https://json.schemastore.org/sarif-2.1.0.json", '
+        b'"version": "2.1.0", "runs": [{"results": ['
+    )
+    separator = b""
+    for result in iter_results(lintrunner_results, last_results):
+        f.write(separator)
+        f.write(json_dumps(result))
+        separator = b", "
+    f.write(b'], "tool": ')
+    f.write(
+        json_dumps(
+            {"driver": {"name": "lintrunner", "rules": build_rules(last_results)}}
+        )
+    )
+    f.write(b"}]}")
 
-    sarif = produce_sarif(lintrunner_jsons)
 
+def main(args: Any) -> None:
+    """Convert the output of lintrunner json to SARIF."""
     output_dir = os.path.dirname(args.output)
     if output_dir:
         os.makedirs(os.path.dirname(args.output), exist_ok=True)
 
-    with open(args.output, "w", encoding="utf-8") as f:
-        json.dump(sarif, f)
+    # Results are written as the input is parsed, so they go to a temporary
+    # file that only replaces the output once the whole input has converted
+    temp_output = args.output + ".tmp"
+    try:
+        # Both decoders take the UTF-8 encoded lines as is
+        with open(args.input, "rb") as input_file, open(
+            temp_output, "wb"
+        ) as output_file:
+            write_sarif((json_loads(line) for line in input_file), output_file)
+        os.replace(temp_output, args.output)
+    except BaseException:
+        if os.path.exists(temp_output):
+            os.remove(temp_output)
+        raise
 
 
 if __name__ == "__main__":
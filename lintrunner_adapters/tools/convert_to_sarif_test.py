@@ -1,6 +1,12 @@
 from __future__ import annotations
 
+import argparse
+import io
+import json
+import os
+import tempfile
 import unittest
+from typing import Any
 
 import convert_to_sarif
 
@@ -174,6 +180,78 @@ class TestConvertToSarif(unittest.TestCase):
         ]
         self.assertEqual(actual["runs"][0]["results"], expected_results)
 
+    def test_write_sarif_writes_the_same_sarif_as_produce_sarif(self) -> None:
+        lintrunner_results: list[dict[str, Any]] = [
+            {
+                "path": "/path/to/test.py",
+                "line": 1,
+                "char": 2,
+                "code": "FLAKE8",
+                "severity": "error",
+                "description": "test description",
+                "name": "test-code",
+            },
+            {
+                "path": "test2.py",
+                "line": None,
+                "char": None,
+                "code": "FLAKE8",
+                "severity": "advice",
+                "description": "test description",
+                "name": "test-code",
+            },
+        ]
+        f = io.BytesIO()
+        convert_to_sarif.write_sarif(lintrunner_results, f)
+        self.assertEqual(
+            json.loads(f.getvalue()), convert_to_sarif.produce_sarif(lintrunner_results)
+        )
+
+    def test_write_sarif_handles_no_results(self) -> None:
+        f = io.BytesIO()
+        convert_to_sarif.write_sarif([], f)
+        self.assertEqual(json.loads(f.getvalue()), convert_to_sarif.produce_sarif([]))
+
+    def test_main_writes_the_sarif_of_the_input(self) -> None:
+        lintrunner_result = {
+            "path": "test.py",
+            "line": 1,
+            "char": 2,
+            "code": "FLAKE8",
+            "severity": "error",
+            "description": "test description",
+            "name": "test-code",
+        }
+        with tempfile.TemporaryDirectory() as tmpdir:
+            args = argparse.Namespace(
+                input=os.path.join(tmpdir, "lint.json"),
+                output=os.path.join(tmpdir, "out", "lint.sarif"),
+            )
+            with open(args.input, "w", encoding="utf-8") as f:
+                f.write(json.dumps(lintrunner_result) + "\n")
+            convert_to_sarif.main(args)
+            with open(args.output, encoding="utf-8") as f:
+                self.assertEqual(
+                    json.load(f), convert_to_sarif.produce_sarif([lintrunner_result])
+                )
+            self.assertEqual(os.listdir(os.path.dirname(args.output)), ["lint.sarif"])
+
+    def test_main_keeps_the_previous_output_when_the_input_is_invalid(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            args = argparse.Namespace(
+                input=os.path.join(tmpdir, "lint.json"),
+                output=os.path.join(tmpdir, "lint.sarif"),
+            )
+            with open(args.input, "w", encoding="utf-8") as f:
+                f.write("not json\n")
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write("previous")
+            with self.assertRaises(ValueError):
+                convert_to_sarif.main(args)
+            with open(args.output, encoding="utf-8") as f:
+                self.assertEqual(f.read(), "previous")
+            self.assertEqual(sorted(os.listdir(tmpdir)), ["lint.json", "lint.sarif"])
+
 
 if __name__ == "__main__":
     unittest.main()